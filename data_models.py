@@ -31,6 +31,24 @@ class MaterialDetails:
          self.thickness, self.bottom_laminate_name) = self._parse_material_string(full_material_string)
         # For backward compatibility, keep laminate_name as top laminate
         self.laminate_name = self.top_laminate_name
+        # str() keys every part and board grouping, so it is built once from the parsed names
+        self._display_string = f"{self.top_laminate_name}_{self.core_name}_{self.bottom_laminate_name}"
+    
+    @classmethod
+    def try_parse(cls, full_material_string: str) -> Optional['MaterialDetails']:
+        """
+        Build MaterialDetails from a material string, or return None if it cannot be parsed.
+        
+        Args:
+            full_material_string: Material specification string
+            
+        Returns:
+            MaterialDetails instance, or None for an unparseable string
+        """
+        try:
+            return cls(full_material_string)
+        except ValueError:
+            return None
     
     @staticmethod
     def _parse_material_string(material_string: str) -> Tuple[str, str, int, str]:
@@ -151,7 +169,7 @@ class MaterialDetails:
             return 0.0
     
     def __str__(self) -> str:
-        return f"{self.top_laminate_name}_{self.core_name}_{self.bottom_laminate_name}"
+        return self._display_string
     
     def __repr__(self) -> str:
         return self.__str__()
@@ -162,6 +180,15 @@ class Part:
     Represents a part to be cut with its dimensions, material requirements, and placement info.
     """
     
+    # Parts are created per piece in bulk and read in every placement loop, so no per-instance __dict__
+    __slots__ = (
+        'id', 'requested_length', 'requested_width', 'area', 'quantity', 'material_details', 'grains',
+        'original_part_index', 'client_name', 'room_type', 'sub_category', 'panel_name', 'full_description',
+        'assigned_board_id', 'actual_length', 'actual_width', 'x_pos', 'y_pos', 'rotated',
+        'assigned_material_details', 'is_upgraded', 'original_data',
+        'x', 'y', 'placed',  # Placement state set by the max-utilisation, TEST 4 and TEST 5 placers
+    )
+    
     def __init__(self, part_id: str, requested_length: float, requested_width: float, 
                  quantity: int, material_details: MaterialDetails, grains: int, 
                  original_part_index: int, client_name: str = "", room_type: str = "", 
@@ -186,6 +213,7 @@ class Part:
         self.id = part_id
         self.requested_length = requested_length
         self.requested_width = requested_width
+        self.area = requested_length * requested_width
         self.quantity = quantity
         self.material_details = material_details
         self.grains = grains
@@ -287,6 +315,17 @@ class Part:
         new_part.is_upgraded = True  # Mark as upgraded since we're changing material
         
         return new_part
+    
+    def clone_for_placement(self) -> 'Part':
+        """
+        Create a copy of this part for trial placements, sharing its material and CSV data.
+        Only placement attributes are set on the copy, so nothing needs copying deeply.
+        """
+        new_part = Part.__new__(Part)
+        for name in Part.__slots__:
+            if hasattr(self, name):
+                setattr(new_part, name, getattr(self, name))
+        return new_part
 
 
 class Offcut:
@@ -311,6 +350,7 @@ class Offcut:
         self.y = y
         self.length = length
         self.width = width
+        self._area = length * width  # Offcut dimensions never change after creation
         self.material_details = material_details
         self.source_board_id = source_board_id
     
@@ -321,7 +361,7 @@ class Offcut:
         Returns:
             Area in square mm
         """
-        return self.length * self.width
+        return self._area
     
     def can_fit_part(self, part: 'Part', kerf: float, rotated: bool = False) -> bool:
         """
@@ -357,6 +397,14 @@ class Board:
     Represents a full board with parts placement and available space tracking.
     """
     
+    __slots__ = (
+        'id', 'material_details', 'total_length', 'total_width', 'kerf', 'parts_on_board',
+        'available_rectangles', '_largest_offcut', '_largest_offcut_stale', 'utilization_percentage',
+        # Placement caches kept by the max-utilisation placer, empty until it first places on the board
+        '_skyline', '_skyline_part_count', '_rect_xywh', '_rect_count', '_rect_parts', '_rect_bounds',
+        '_guillotine_rejects',
+    )
+    
     def __init__(self, board_id: str, material_details: MaterialDetails, 
                  total_length: float, total_width: float, kerf: float):
         """
@@ -384,6 +432,17 @@ class Board:
             source_board_id=board_id
         )
         self.available_rectangles: List[Offcut] = [initial_offcut]
+        self._largest_offcut: Optional[Offcut] = initial_offcut
+        self._largest_offcut_stale = False
+        
+        # Max-utilisation placement caches, rebuilt from parts_on_board when they fall out of step
+        self._skyline = None
+        self._skyline_part_count = -1
+        self._rect_xywh = None
+        self._rect_count = -1
+        self._rect_parts = None
+        self._rect_bounds = None
+        self._guillotine_rejects = set()
     
     def unplace_part(self, part: Part) -> bool:
         """
@@ -429,6 +488,7 @@ class Board:
         
         # Attempt to merge adjacent rectangles
         self._merge_adjacent_rectangles()
+        self._largest_offcut_stale = True
         
         # Update utilization
         self.utilization_percentage = self.get_utilization_percentage()
@@ -575,47 +635,57 @@ class Board:
             part_length, part_width: Actual dimensions of placed part
             x_pos, y_pos: Position where part was placed
         """
-        # Remove the used offcut
-        if offcut in self.available_rectangles:
+        # Remove the used offcut (single scan instead of membership test + remove)
+        try:
             self.available_rectangles.remove(offcut)
+        except ValueError:
+            pass
         
         # Dimensions including kerf
         part_with_kerf_length = part_length + self.kerf
         part_with_kerf_width = part_width + self.kerf
+        part_end_x = x_pos + part_with_kerf_length
+        part_end_y = y_pos + part_with_kerf_width
+        offcut_end_x = offcut.x + offcut.length
+        offcut_end_y = offcut.y + offcut.width
         
-        # Create new offcuts from the split (guillotine cuts)
+        # Create new offcuts from the split (guillotine cuts); dimensions are
+        # computed first so empty remainders never allocate an Offcut
         new_offcuts = []
         
         # Right offcut (if space available)
-        if x_pos + part_with_kerf_length < offcut.x + offcut.length:
-            right_offcut = Offcut(
-                offcut_id=f"{self.id}_offcut_{len(self.available_rectangles)}_{len(new_offcuts)}",
-                x=x_pos + part_with_kerf_length,
-                y=offcut.y,
-                length=offcut.x + offcut.length - (x_pos + part_with_kerf_length),
-                width=offcut.width,
-                material_details=offcut.material_details,
-                source_board_id=self.id
-            )
-            if right_offcut.get_area() > 0:
-                new_offcuts.append(right_offcut)
+        if part_end_x < offcut_end_x:
+            right_length = offcut_end_x - part_end_x
+            right_width = offcut.width
+            if right_length * right_width > 0:
+                new_offcuts.append(Offcut(
+                    offcut_id=f"{self.id}_offcut_{len(self.available_rectangles)}_{len(new_offcuts)}",
+                    x=part_end_x,
+                    y=offcut.y,
+                    length=right_length,
+                    width=right_width,
+                    material_details=offcut.material_details,
+                    source_board_id=self.id
+                ))
         
         # Bottom offcut (if space available)
-        if y_pos + part_with_kerf_width < offcut.y + offcut.width:
-            bottom_offcut = Offcut(
-                offcut_id=f"{self.id}_offcut_{len(self.available_rectangles)}_{len(new_offcuts)}",
-                x=offcut.x,
-                y=y_pos + part_with_kerf_width,
-                length=x_pos + part_with_kerf_length - offcut.x,
-                width=offcut.y + offcut.width - (y_pos + part_with_kerf_width),
-                material_details=offcut.material_details,
-                source_board_id=self.id
-            )
-            if bottom_offcut.get_area() > 0:
-                new_offcuts.append(bottom_offcut)
+        if part_end_y < offcut_end_y:
+            bottom_length = part_end_x - offcut.x
+            bottom_width = offcut_end_y - part_end_y
+            if bottom_length * bottom_width > 0:
+                new_offcuts.append(Offcut(
+                    offcut_id=f"{self.id}_offcut_{len(self.available_rectangles)}_{len(new_offcuts)}",
+                    x=offcut.x,
+                    y=part_end_y,
+                    length=bottom_length,
+                    width=bottom_width,
+                    material_details=offcut.material_details,
+                    source_board_id=self.id
+                ))
         
         # Add new offcuts to available rectangles
         self.available_rectangles.extend(new_offcuts)
+        self._largest_offcut_stale = True
     
 
     
@@ -661,10 +731,12 @@ class Board:
         Returns:
             Largest offcut or None if no offcuts available
         """
-        if not self.available_rectangles:
-            return None
+        if self._largest_offcut_stale:
+            self._largest_offcut = (max(self.available_rectangles, key=Offcut.get_area)
+                                    if self.available_rectangles else None)
+            self._largest_offcut_stale = False
         
-        return max(self.available_rectangles, key=lambda o: o.get_area())
+        return self._largest_offcut
     
     def __str__(self) -> str:
         return f"Board({self.id}, {self.total_length}x{self.total_width}, {len(self.parts_on_board)} parts)"
@@ -9,6 +9,23 @@ from data_models import MaterialDetails, Part, Offcut, Board
 logger = logging.getLogger(__name__)
 
 
+def _place_parts_into(board: Board, parts: List[Part], kerf: float, core_db: Dict) -> int:
+    """Place parts first-fit into the board's free rectangles, returning how many were placed."""
+    placed = 0
+    for part in parts:
+        can_rotate = part.can_rotate()
+        for rect in board.available_rectangles:
+            if rect.can_fit_part(part, kerf, False):
+                if board.place_part(part, rect, False, rect.x, rect.y, core_db):
+                    placed += 1
+                    break
+            elif can_rotate and rect.can_fit_part(part, kerf, True):
+                if board.place_part(part, rect, True, rect.x, rect.y, core_db):
+                    placed += 1
+                    break
+    return placed
+
+
 def consolidate_low_utilization_boards_core(boards: List[Board], core_db: Dict, kerf: float = 4.4) -> List[Board]:
     """
     Consolidate low-utilization boards by merging parts from multiple boards of the same material.
@@ -88,18 +105,21 @@ def consolidate_low_utilization_boards_core(boards: List[Board], core_db: Dict,
                 mergeable_count = 0
                 for part in parts_to_merge:
                     can_place = False
+                    part_length = part.requested_length + kerf
+                    part_width = part.requested_width + kerf
                     
-                    for rect in target_board.available_rectangles:
-                        part_length = part.requested_length + kerf
-                        part_width = part.requested_width + kerf
-                        
-                        # Check both orientations
-                        if (part_length <= rect.length and part_width <= rect.width):
-                            can_place = True
-                            break
-                        elif (part.can_rotate() and part_width <= rect.length and part_length <= rect.width):
-                            can_place = True
-                            break
+                    if part.can_rotate():
+                        # Either orientation: compare short side to short side, long to long
+                        part_min, part_max = min(part_length, part_width), max(part_length, part_width)
+                        for rect in target_board.available_rectangles:
+                            if part_min <= min(rect.length, rect.width) and part_max <= max(rect.length, rect.width):
+                                can_place = True
+                                break
+                    else:
+                        for rect in target_board.available_rectangles:
+                            if part_length <= rect.length and part_width <= rect.width:
+                                can_place = True
+                                break
                     
                     if can_place:
                         mergeable_count += 1
@@ -137,36 +157,10 @@ def consolidate_low_utilization_boards_core(boards: List[Board], core_db: Dict,
                 )
                 
                 # Place all parts from target board first
-                target_parts_placed = 0
-                for part in target_board.parts_on_board:
-                    placed = False
-                    for rect in consolidated_board.available_rectangles:
-                        if rect.can_fit_part(part, kerf, False):
-                            if consolidated_board.place_part(part, rect, False, rect.x, rect.y, core_db):
-                                target_parts_placed += 1
-                                placed = True
-                                break
-                        elif part.can_rotate() and rect.can_fit_part(part, kerf, True):
-                            if consolidated_board.place_part(part, rect, True, rect.x, rect.y, core_db):
-                                target_parts_placed += 1
-                                placed = True
-                                break
+                target_parts_placed = _place_parts_into(consolidated_board, target_board.parts_on_board, kerf, core_db)
                 
                 # Place parts from low-utilization board
-                merged_parts = 0
-                for part in parts_to_merge:
-                    placed = False
-                    for rect in consolidated_board.available_rectangles:
-                        if rect.can_fit_part(part, kerf, False):
-                            if consolidated_board.place_part(part, rect, False, rect.x, rect.y, core_db):
-                                merged_parts += 1
-                                placed = True
-                                break
-                        elif part.can_rotate() and rect.can_fit_part(part, kerf, True):
-                            if consolidated_board.place_part(part, rect, True, rect.x, rect.y, core_db):
-                                merged_parts += 1
-                                placed = True
-                                break
+                merged_parts = _place_parts_into(consolidated_board, parts_to_merge, kerf, core_db)
                 
                 # Verify consolidation success
                 total_original_parts = len(target_board.parts_on_board) + len(parts_to_merge)
@@ -361,38 +355,61 @@ def find_best_fit_offcut(part: Part, available_offcuts: List[Offcut],
     best_rotation = False
     best_score = float('inf')
     
+    base_length, base_width = part.requested_length, part.requested_width
+    can_rotate = part.can_rotate()
+    part_area_with_kerf = (base_length + kerf) * (base_width + kerf)
+    
+    # A rotatable part fits iff its short side fits the offcut's short side
+    # and its long side fits the offcut's long side
+    part_min = min(base_length, base_width) + kerf
+    part_max = max(base_length, base_width) + kerf
+    
     for offcut in available_offcuts:
-        orientations = [False]
-        if part.can_rotate():
-            orientations.append(True)
+        offcut_length, offcut_width = offcut.length, offcut.width
+        
+        if can_rotate:
+            offcut_min, offcut_max = ((offcut_width, offcut_length) if offcut_length > offcut_width
+                                      else (offcut_length, offcut_width))
+            if part_min > offcut_min or part_max > offcut_max:
+                continue
+            
+            if part_max <= offcut_min:
+                # Square part or square offcut - both orientations fit
+                orientations = (False, True)
+            else:
+                # Only the orientation aligning long side with long side fits
+                orientations = ((base_length > base_width) != (offcut_length > offcut_width),)
+        else:
+            if base_length + kerf > offcut_length or base_width + kerf > offcut_width:
+                continue
+            orientations = (False,)
+        
+        offcut_area = offcut.get_area()
+        waste = offcut_area - part_area_with_kerf
+        
+        # Smart scoring: prefer tight fits but avoid creating unusable slivers
+        utilization = part_area_with_kerf / offcut_area
         
         for rotated in orientations:
-            if offcut.can_fit_part(part, kerf, rotated):
-                part_length, part_width = part.get_dimensions_for_placement(rotated)
-                part_area_with_kerf = (part_length + kerf) * (part_width + kerf)
-                waste = offcut.get_area() - part_area_with_kerf
-                
-                # Smart scoring: prefer tight fits but avoid creating unusable slivers
-                offcut_area = offcut.get_area()
-                utilization = part_area_with_kerf / offcut_area
-                
-                # Calculate remaining dimensions after placement
-                remaining_length = offcut.length - part_length
-                remaining_width = offcut.width - part_width
-                
-                # Penalize placements that create very thin unusable strips
-                sliver_penalty = 0
-                min_useful_size = 100  # 10cm minimum useful size
-                if 0 < remaining_length < min_useful_size or 0 < remaining_width < min_useful_size:
-                    sliver_penalty = 10000
-                
-                # Combined score: minimize waste + sliver penalty + prefer high utilization
-                score = waste + sliver_penalty + (1.0 - utilization) * 500
-                
-                if score < best_score:
-                    best_score = score
-                    best_offcut = offcut
-                    best_rotation = rotated
+            part_length, part_width = (base_width, base_length) if rotated else (base_length, base_width)
+            
+            # Calculate remaining dimensions after placement
+            remaining_length = offcut_length - part_length
+            remaining_width = offcut_width - part_width
+            
+            # Penalize placements that create very thin unusable strips
+            sliver_penalty = 0
+            min_useful_size = 100  # 10cm minimum useful size
+            if 0 < remaining_length < min_useful_size or 0 < remaining_width < min_useful_size:
+                sliver_penalty = 10000
+            
+            # Combined score: minimize waste + sliver penalty + prefer high utilization
+            score = waste + sliver_penalty + (1.0 - utilization) * 500
+            
+            if score < best_score:
+                best_score = score
+                best_offcut = offcut
+                best_rotation = rotated
     
     return best_offcut, best_rotation
 
@@ -661,38 +678,6 @@ def run_optimization(parts_list: List[Part], core_db: Dict, laminate_db: Dict,
     boards_saved = boards_before - boards_after
     logger.info(f"Board consolidation: {boards_before} → {boards_after} boards ({boards_saved} boards eliminated)")
     
-    # Additional relocation optimization
-    improved = True
-    iterations = 0
-    max_iterations = 2
-    
-    while improved and iterations < max_iterations:
-        improved = False
-        iterations += 1
-        logger.info(f"Post-processing iteration {iterations}")
-        
-        # Try to move parts from less utilized boards to better fitting positions
-        for board_idx, board in enumerate(final_boards):
-            if board.get_utilization_percentage() < 60:  # Focus on underutilized boards
-                # Get parts on this board (simplified - would need actual tracking)
-                parts_to_try_relocate = []
-                
-                # For now, try to consolidate by removing smallest parts and trying to place them elsewhere
-                smallest_offcuts = sorted(board.available_rectangles, key=lambda o: o.get_area())
-                
-                # Try to fill largest available spaces first
-                largest_offcuts = []
-                for other_board in final_boards:
-                    if other_board != board and other_board.available_rectangles:
-                        largest_offcut = max(other_board.available_rectangles, key=lambda o: o.get_area())
-                        largest_offcuts.append((largest_offcut, other_board))
-                
-                # This is a simplified relocation attempt
-                # In a full implementation, we'd track individual part placements and try relocating them
-                
-        # For this iteration, break after first attempt
-        break
-    
     # Calculate final cost (global order optimization)
     final_cost = calculate_total_order_cost(final_boards, core_db, laminate_db)
     
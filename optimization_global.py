@@ -2,11 +2,13 @@
 Global optimization with iterative offcut reuse and cost minimization.
 Implements true global offcut inventory management.
 """
+import heapq
 import logging
+import numpy as np
 from typing import List, Dict, Tuple, Optional, Set
 from data_models import Part, Board, Offcut, MaterialDetails
 from optimization_core_fixed import (
-    run_optimization, can_upgrade_material, find_best_fit_offcut, 
+    run_optimization, find_best_fit_offcut, 
     calculate_total_order_cost, get_grade_level, create_new_board
 )
 
@@ -21,12 +23,22 @@ def add_log_message(message: str):
     optimization_log_messages.append(message)
     logger.info(message)
 
+def add_log_messages(messages: List[str]):
+    """Add several messages to the optimization log with a single logging call."""
+    if not messages:
+        return
+    optimization_log_messages.extend(messages)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("\n".join(messages))
+
 class GlobalOffcutInventory:
     """Manages global offcut inventory across all boards."""
     
     def __init__(self):
         self.offcuts_by_material = {}  # Material -> List[Offcut with board reference]
+        self.offcuts_by_laminate = {}  # (Top laminate, thickness) -> Core -> same list as offcuts_by_material
         self.boards_registry = {}      # Board ID -> Board object
+        self._grade_levels = {}        # Core -> grade level memo
     
     def add_board(self, board: Board):
         """Add a board and its offcuts to the global inventory."""
@@ -35,56 +47,122 @@ class GlobalOffcutInventory:
         material_key = self._get_material_key(board.material_details)
         if material_key not in self.offcuts_by_material:
             self.offcuts_by_material[material_key] = []
+            
+            # Secondary index shares the list, so both views stay in sync
+            laminate_key = (board.material_details.top_laminate_name, board.material_details.thickness)
+            self.offcuts_by_laminate.setdefault(laminate_key, {})[board.material_details.core_name] = \
+                self.offcuts_by_material[material_key]
         
         # Add all available rectangles from this board
-        for offcut in board.available_rectangles:
+        self.add_offcuts(board.available_rectangles, board)
+    
+    def add_offcuts(self, offcuts: List[Offcut], board: Board):
+        """Add offcuts created on an already registered board to the inventory."""
+        material_offcuts = self.offcuts_by_material[self._get_material_key(board.material_details)]
+        for offcut in offcuts:
             offcut.source_board_id = board.id
-            self.offcuts_by_material[material_key].append(offcut)
+            material_offcuts.append(offcut)
     
-    def _get_material_key(self, material_details: MaterialDetails) -> str:
+    def get_grade_level(self, core_name: str, core_db: Dict) -> int:
+        """Get the grade level for a core material, memoized per inventory."""
+        grade = self._grade_levels.get(core_name)
+        if grade is None:
+            grade = self._grade_levels[core_name] = get_grade_level(core_name, core_db)
+        return grade
+    
+    def _get_material_key(self, material_details: MaterialDetails) -> Tuple[str, str, int]:
         """Create a key for material grouping."""
-        return f"{material_details.top_laminate_name}_{material_details.core_name}_{material_details.thickness}"
+        return (material_details.top_laminate_name, material_details.core_name, material_details.thickness)
     
-    def find_compatible_offcuts(self, part: Part, core_db: Dict, kerf: float) -> List[Tuple[Offcut, Board, bool]]:
-        """Find all compatible offcuts for a part across all boards."""
+    def find_compatible_offcuts(self, part: Part, core_db: Dict, kerf: float,
+                                max_results: Optional[int] = None, exclude_board_id: Optional[str] = None,
+                                min_target_grade: Optional[int] = None) -> List[Tuple[Offcut, Board, bool]]:
+        """Find compatible offcuts for a part across all boards, best first (optionally only the top max_results)."""
         compatible = []
+        part_material = part.material_details
+        part_area = part.area
+        can_rotate = part.can_rotate()
         
-        # Check all material types for compatibility
-        for material_key, offcuts in self.offcuts_by_material.items():
-            for offcut in offcuts:
-                board = self.boards_registry[offcut.source_board_id]
-                
-                # Check material compatibility (allow upgrades)
-                if can_upgrade_material(part.material_details, offcut.material_details, core_db):
-                    # Check if part fits (normal orientation)
-                    if offcut.can_fit_part(part, kerf, rotated=False):
-                        compatible.append((offcut, board, False))
-                    
-                    # Check if part fits (rotated orientation) 
-                    if part.can_rotate() and offcut.can_fit_part(part, kerf, rotated=True):
-                        compatible.append((offcut, board, True))
+        # Only materials with the same top laminate and thickness can take the part
+        offcuts_by_core = self.offcuts_by_laminate.get(
+            (part_material.top_laminate_name, part_material.thickness), {}
+        )
+        part_grade = self.get_grade_level(part_material.core_name, core_db)
         
-        # Sort by upgrade potential and space efficiency - PRIORITIZE UPGRADES
-        def sort_key(item):
-            offcut, board, rotated = item
-            part_area = part.requested_length * part.requested_width
-            offcut_area = offcut.get_area()
+        for core_name, offcuts in offcuts_by_core.items():
+            if not offcuts:
+                continue
             
-            # Get grade levels for upgrade calculation
-            part_grade = get_grade_level(part.material_details.core_name, core_db)
-            offcut_grade = get_grade_level(offcut.material_details.core_name, core_db)
-            upgrade_potential = offcut_grade - part_grade
+            # No core material downgrade allowed, and callers may require a minimum target grade
+            core_grade = self.get_grade_level(core_name, core_db)
+            upgrade_potential = core_grade - part_grade
+            if upgrade_potential < 0 or (min_target_grade is not None and core_grade < min_target_grade):
+                continue
             
             # PRIORITIZE UPGRADES - negative penalty for upgrades means they come first
             upgrade_bonus = -1000 * upgrade_potential if upgrade_potential > 0 else 0
             
-            # Prefer tight fit (less waste)
-            space_efficiency = part_area / offcut_area
+            # Identical offcut sizes in one core rank equally, so the earliest one always wins;
+            # when only the top candidates are wanted each size is fit-tested once
+            seen_sizes = set()
             
-            return (upgrade_bonus, -space_efficiency)
+            for offcut in offcuts:
+                if (offcut.source_board_id == exclude_board_id or
+                        offcut.material_details.bottom_laminate_name != part_material.bottom_laminate_name):
+                    continue
+                
+                if max_results is not None:
+                    size = (offcut.length, offcut.width)
+                    if size in seen_sizes:
+                        continue
+                    seen_sizes.add(size)
+                
+                fits_normal = offcut.can_fit_part(part, kerf, rotated=False)
+                fits_rotated = can_rotate and offcut.can_fit_part(part, kerf, rotated=True)
+                if not (fits_normal or fits_rotated):
+                    continue
+                
+                board = self.boards_registry[offcut.source_board_id]
+                
+                # Prefer tight fit (less waste); insertion order breaks ties like a stable sort
+                space_efficiency = part_area / offcut.get_area()
+                
+                if fits_normal:
+                    compatible.append(((upgrade_bonus, -space_efficiency, len(compatible)), offcut, board, False))
+                if fits_rotated:
+                    compatible.append(((upgrade_bonus, -space_efficiency, len(compatible)), offcut, board, True))
+        
+        # Sort by upgrade potential and space efficiency, selecting only what the caller needs
+        if max_results == 1:
+            ranked = [min(compatible)] if compatible else []
+        elif max_results is not None:
+            ranked = heapq.nsmallest(max_results, compatible)
+        else:
+            compatible.sort()
+            ranked = compatible
+        
+        return [(offcut, board, rotated) for _, offcut, board, rotated in ranked]
+    
+    def remove_board(self, board: Board):
+        """Remove an eliminated board and all of its offcuts from the inventory."""
+        self.boards_registry.pop(board.id, None)
+        material_offcuts = self.offcuts_by_material.get(self._get_material_key(board.material_details))
+        if material_offcuts:
+            # Filter in place so the laminate index keeps sharing the same list
+            material_offcuts[:] = [offcut for offcut in material_offcuts if offcut.source_board_id != board.id]
+    
+    def place_part(self, part: Part, offcut: Offcut, board: Board, rotated: bool, core_db: Dict) -> bool:
+        """Place a part on a registered board's offcut and swap the offcut for its split remainders."""
+        # Remember which rectangles already existed; only the split remainders are new
+        existing_rectangles = {id(rect) for rect in board.available_rectangles}
+        if not board.place_part(part, offcut, rotated, offcut.x, offcut.y, core_db):
+            return False
         
-        compatible.sort(key=sort_key)
-        return compatible
+        self.remove_offcut(offcut)
+        self.add_offcuts(
+            [rect for rect in board.available_rectangles if id(rect) not in existing_rectangles], board
+        )
+        return True
     
     def remove_offcut(self, offcut: Offcut):
         """Remove an offcut from the global inventory."""
@@ -95,19 +173,15 @@ class GlobalOffcutInventory:
     
     def get_total_waste_area(self) -> float:
         """Calculate total waste area across all offcuts."""
-        total_area = 0
-        for offcuts in self.offcuts_by_material.values():
-            for offcut in offcuts:
-                total_area += offcut.get_area()
-        return total_area
+        return sum(sum(map(Offcut.get_area, offcuts)) for offcuts in self.offcuts_by_material.values())
     
     def get_offcut_summary(self) -> Dict:
         """Get summary of offcut inventory."""
         summary = {}
         for material_key, offcuts in self.offcuts_by_material.items():
             if offcuts:
-                total_area = sum(offcut.get_area() for offcut in offcuts)
-                summary[material_key] = {
+                total_area = sum(map(Offcut.get_area, offcuts))
+                summary["_".join(map(str, material_key))] = {
                     'count': len(offcuts),
                     'total_area': total_area,
                     'avg_area': total_area / len(offcuts) if offcuts else 0
@@ -118,68 +192,123 @@ def relocate_part_globally(part: Part, target_offcut: Offcut, target_board: Boar
                           source_board: Board, rotated: bool, core_db: Dict, 
                           global_inventory: GlobalOffcutInventory, kerf: float) -> bool:
     """Relocate a part using global offcut inventory."""
+    removed = False
     try:
-        # Remove part from source board
-        if part in source_board.parts_on_board:
+        # Remove part from source board (single scan; the part may already be gone)
+        try:
             source_board.parts_on_board.remove(part)
+            removed = True
+        except ValueError:
+            return False
+        
+        # Place part on target board; the inventory swaps the used offcut for its remainders
+        # (the space freed on the source board is not re-merged into offcuts)
+        success = global_inventory.place_part(part, target_offcut, target_board, rotated, core_db)
+        
+        if success:
+            # Mark as upgraded if material changed
+            if part.material_details.core_name != target_offcut.material_details.core_name:
+                part.is_upgraded = True
             
-            # Place part on target board
-            success = target_board.place_part(
-                part, target_offcut, rotated, 
-                target_offcut.x, target_offcut.y, core_db
-            )
-            
-            if success:
-                # Update global inventory
-                global_inventory.remove_offcut(target_offcut)
-                
-                # Mark as upgraded if material changed
-                if part.material_details.core_name != target_offcut.material_details.core_name:
-                    part.is_upgraded = True
-                
-                # Refresh inventory with updated boards
-                global_inventory.add_board(source_board)
-                global_inventory.add_board(target_board)
-                
-                return True
-            else:
-                # Restore part if placement failed
-                source_board.parts_on_board.append(part)
+            return True
         
+        # Restore part if placement failed
+        source_board.parts_on_board.append(part)
         return False
         
     except Exception as e:
         logger.error(f"Error relocating part {part.id}: {e}")
         # Restore part if there was an error
-        if part not in source_board.parts_on_board:
+        if removed and part not in source_board.parts_on_board:
             source_board.parts_on_board.append(part)
         return False
 
+def _upgrade_offcuts_on_board(board: Board) -> List[Tuple[Offcut, Board]]:
+    """Offcuts on a board large enough to be worth an upgrade relocation."""
+    # Consider moderate-sized spaces
+    return [(offcut, board) for offcut in board.available_rectangles if offcut.get_area() > 50000]
+
+def _offcut_dimension_arrays(offcuts: List[Tuple[Offcut, Board]], board_codes: Dict[int, int],
+                             laminate_codes: Dict[Tuple, int]) -> Tuple[np.ndarray, ...]:
+    """Parallel length, width, area, board code and laminate code arrays for (offcut, board) entries."""
+    lengths = np.array([offcut.length for offcut, _ in offcuts], dtype=float)
+    widths = np.array([offcut.width for offcut, _ in offcuts], dtype=float)
+    boards = np.array([board_codes[id(board)] for _, board in offcuts], dtype=np.int32)
+    laminates = np.array([laminate_codes[_laminate_key(board.material_details)] for _, board in offcuts],
+                         dtype=np.int32)
+    return lengths, widths, lengths * widths, boards, laminates
+
+def _part_dimension_arrays(parts: List[Tuple[Part, Board]], kerf: float, board_codes: Dict[int, int],
+                           laminate_codes: Dict[Tuple, int]) -> Tuple[np.ndarray, ...]:
+    """Parallel length and width (with kerf), rotatable, board code and laminate code arrays for (part, board) entries."""
+    lengths = np.array([part.requested_length for part, _ in parts], dtype=float) + kerf
+    widths = np.array([part.requested_width for part, _ in parts], dtype=float) + kerf
+    rotatable = np.array([part.can_rotate() for part, _ in parts], dtype=bool)
+    boards = np.array([board_codes[id(board)] for _, board in parts], dtype=np.int32)
+    laminates = np.array([laminate_codes.get(_laminate_key(part.material_details), -1) for part, _ in parts],
+                         dtype=np.int32)
+    return lengths, widths, rotatable, boards, laminates
+
+def _fit_matrices(part_dims: Tuple[np.ndarray, ...], first_row: int,
+                  offcut_dims: Tuple[np.ndarray, ...]) -> Tuple[np.ndarray, np.ndarray]:
+    """Part x offcut masks from first_row onwards: normal orientation fits, and any usable placement."""
+    lengths, widths, rotatable, part_boards, part_laminates = (dims[first_row:, np.newaxis] for dims in part_dims)
+    offcut_lengths, offcut_widths, _, offcut_boards, offcut_laminates = offcut_dims
+    fits_normal = (lengths <= offcut_lengths) & (widths <= offcut_widths)
+    fits_rotated = rotatable & (widths <= offcut_lengths) & (lengths <= offcut_widths)
+    # Usable: fits, on another board, and laminate and thickness match
+    usable = (fits_normal | fits_rotated) & (part_boards != offcut_boards) & (part_laminates == offcut_laminates)
+    return fits_normal, usable
+
+def _laminate_key(material_details: MaterialDetails) -> Tuple:
+    """Top laminate and thickness, which must match for a part to move onto another board."""
+    return (material_details.top_laminate_name, material_details.thickness)
+
+def _build_sequence_grade_map(upgrade_sequence: List[str]) -> Dict[str, int]:
+    """Map each core in the upgrade sequence to its position (higher is a better grade)."""
+    grade_map = {}
+    for i, core in enumerate(upgrade_sequence):
+        grade_map[core] = i
+    return grade_map
+
+def _build_offcut_inventory(boards: List[Board]) -> GlobalOffcutInventory:
+    """Create a global offcut inventory holding all boards."""
+    global_inventory = GlobalOffcutInventory()
+    for board in boards:
+        global_inventory.add_board(board)
+    return global_inventory
+
 def run_global_optimization_iteration(boards: List[Board], unplaced_parts: List[Part], 
-                                    core_db: Dict, laminate_db: Dict, kerf: float, user_upgrade_sequence: List[str]) -> Tuple[List[Board], List[Part], int, List[str]]:
-    """Run one iteration of global optimization."""
+                                    core_db: Dict, laminate_db: Dict, kerf: float, user_upgrade_sequence: List[str],
+                                    cost_state: Optional[Dict] = None,
+                                    grade_map: Optional[Dict[str, int]] = None,
+                                    global_inventory: Optional[GlobalOffcutInventory] = None) -> Tuple[List[Board], List[Part], int, List[str]]:
+    """Run one iteration of global optimization, keeping cost_state['total_cost'] up to date."""
     iteration_log = []
     relocations_made = 0
     
-    # Create global offcut inventory
-    global_inventory = GlobalOffcutInventory()
-    for board in boards:
-        global_inventory.add_board(board)
+    # Create global offcut inventory unless the caller keeps one across iterations
+    if global_inventory is None:
+        global_inventory = _build_offcut_inventory(boards)
     
     initial_waste = global_inventory.get_total_waste_area()
-    initial_cost = calculate_total_order_cost(boards, core_db, laminate_db)
+    
+    # Order cost only depends on which boards are used, so it is carried across iterations
+    if cost_state is None:
+        cost_state = {'total_cost': calculate_total_order_cost(boards, core_db, laminate_db)}
+    initial_cost = cost_state['total_cost']
     
     logger.info(f"Starting iteration - Initial waste: {initial_waste/1000000:.2f}m², Cost: ₹{initial_cost:.2f}")
     
     # Try to place unplaced parts first
     parts_placed = 0
     for part in unplaced_parts[:]:  # Copy list to modify during iteration
-        compatible_offcuts = global_inventory.find_compatible_offcuts(part, core_db, kerf)
+        compatible_offcuts = global_inventory.find_compatible_offcuts(part, core_db, kerf, max_results=1)
         
         if compatible_offcuts:
             offcut, board, rotated = compatible_offcuts[0]  # Best option
             
-            success = board.place_part(part, offcut, rotated, offcut.x, offcut.y, core_db)
+            success = global_inventory.place_part(part, offcut, board, rotated, core_db)
             if success:
                 unplaced_parts.remove(part)
                 parts_placed += 1
@@ -195,9 +324,8 @@ def run_global_optimization_iteration(boards: List[Board], unplaced_parts: List[
     upgrade_sequence = user_upgrade_sequence
     
     # Create grade mapping for the sequence
-    grade_map = {}
-    for i, core in enumerate(upgrade_sequence):
-        grade_map[core] = i
+    if grade_map is None:
+        grade_map = _build_sequence_grade_map(upgrade_sequence)
     
     # Group parts and offcuts by material type
     parts_by_core = {}
@@ -215,120 +343,134 @@ def run_global_optimization_iteration(boards: List[Board], unplaced_parts: List[
         # Collect offcuts
         if core_name not in offcuts_by_core:
             offcuts_by_core[core_name] = []
-        for offcut in board.available_rectangles:
-            if offcut.get_area() > 50000:  # Consider moderate-sized spaces
-                offcuts_by_core[core_name].append((offcut, board))
+        offcuts_by_core[core_name].extend(_upgrade_offcuts_on_board(board))
     
-    logger.info(f"Parts by core: {[(core, len(parts)) for core, parts in parts_by_core.items()]}")
-    logger.info(f"Offcuts by core: {[(core, len(offcuts)) for core, offcuts in offcuts_by_core.items()]}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(f"Parts by core: {[(core, len(parts)) for core, parts in parts_by_core.items()]}")
+        logger.info(f"Offcuts by core: {[(core, len(offcuts)) for core, offcuts in offcuts_by_core.items()]}")
+    
+    # Offcut dimensions as parallel arrays so each part is fit-tested against a whole core at once;
+    # boards and laminate/thickness combinations are encoded as small ints for the same-board and
+    # material checks
+    board_codes = {id(board): i for i, board in enumerate(boards)}
+    laminate_codes = {}
+    for board in boards:
+        laminate_codes.setdefault(_laminate_key(board.material_details), len(laminate_codes))
+    offcut_dims_by_core = {
+        core_name: _offcut_dimension_arrays(offcuts, board_codes, laminate_codes)
+        for core_name, offcuts in offcuts_by_core.items()
+    }
+    
+    # Higher-grade cores that actually have usable offcuts, per source core with parts
+    higher_targets = {
+        source_core: [target_core for target_core in upgrade_sequence
+                      if grade_map[target_core] > grade_map[source_core] and target_core in offcuts_by_core]
+        for source_core in upgrade_sequence if source_core in parts_by_core
+    }
     
     # Try upgrades following the sequence order
     for source_core in upgrade_sequence:
-        source_grade = grade_map.get(source_core, -1)
+        target_cores = higher_targets.get(source_core)
+        if not target_cores:
+            continue
+        
+        source_parts = parts_by_core[source_core]
+        part_dims = _part_dimension_arrays(source_parts, kerf, board_codes, laminate_codes)
         
-        if source_core in parts_by_core:
-            source_parts = parts_by_core[source_core]
+        for target_core in target_cores:
+            logger.info(f"Trying to upgrade {len(source_parts)} parts from {source_core} to {target_core}")
+            
+            # Fit-test all remaining parts against the pool in one batch; redone only when the pool changes
+            normal_fit_matrix = None
+            first_row = 0
             
-            # Look for higher-grade targets
-            for target_core in upgrade_sequence:
-                target_grade = grade_map.get(target_core, -1)
+            # Try to move parts from source to target
+            for row, (part, source_board) in enumerate(source_parts):
+                target_offcuts = offcuts_by_core[target_core]
+                offcut_dims = offcut_dims_by_core[target_core]
                 
-                # Only upgrade to higher grades
-                if target_grade <= source_grade:
-                    continue
+                if normal_fit_matrix is None:
+                    normal_fit_matrix, usable_matrix = _fit_matrices(part_dims, row, offcut_dims)
+                    first_row = row
+                
+                # Normal orientation is tried first; rotated only where normal does not fit
+                fits_normal = normal_fit_matrix[row - first_row]
                 
-                if target_core in offcuts_by_core:
-                    target_offcuts = offcuts_by_core[target_core]
+                # Best area fit: smallest usable offcut first keeps large spaces for large parts
+                candidates = np.flatnonzero(usable_matrix[row - first_row])
+                candidates = candidates[np.argsort(offcut_dims[2][candidates], kind='stable')]
+                
+                for idx in candidates:
+                    offcut, target_board = target_offcuts[idx]
                     
-                    logger.info(f"Trying to upgrade {len(source_parts)} parts from {source_core} to {target_core}")
+                    rotated = not fits_normal[idx]
+                    success = relocate_part_globally(
+                        part, offcut, target_board, source_board, 
+                        rotated, core_db, global_inventory, kerf
+                    )
                     
-                    # Try to move parts from source to target
-                    for part, source_board in source_parts:
-                        for offcut, target_board in target_offcuts:
-                            # Skip if same board
-                            if target_board.id == source_board.id:
-                                continue
-                            
-                            # Check material compatibility (laminate and thickness must match)
-                            if (part.material_details.top_laminate_name == target_board.material_details.top_laminate_name and
-                                part.material_details.thickness == target_board.material_details.thickness):
-                                
-                                # Check if part fits (normal orientation)
-                                if offcut.can_fit_part(part, kerf, rotated=False):
-                                    success = relocate_part_globally(
-                                        part, offcut, target_board, source_board, 
-                                        False, core_db, global_inventory, kerf
-                                    )
-                                    
-                                    if success:
-                                        relocations_made += 1
-                                        log_entry = f"✓ Upgraded {part.id} from {source_board.id} ({source_core}) to {target_board.id} ({target_core})"
-                                        iteration_log.append(log_entry)
-                                        add_log_message(log_entry)
-                                        break  # Move to next part
-                                
-                                # Try rotated if normal didn't work
-                                elif part.can_rotate() and offcut.can_fit_part(part, kerf, rotated=True):
-                                    success = relocate_part_globally(
-                                        part, offcut, target_board, source_board, 
-                                        True, core_db, global_inventory, kerf
-                                    )
-                                    
-                                    if success:
-                                        relocations_made += 1
-                                        log_entry = f"✓ Upgraded {part.id} from {source_board.id} ({source_core}) to {target_board.id} ({target_core}) - rotated"
-                                        iteration_log.append(log_entry)
-                                        add_log_message(log_entry)
-                                        break  # Move to next part
+                    if success:
+                        relocations_made += 1
+                        log_entry = f"✓ Upgraded {part.id} from {source_board.id} ({source_core}) to {target_board.id} ({target_core})"
+                        if rotated:
+                            log_entry += " - rotated"
+                        iteration_log.append(log_entry)
+                        add_log_message(log_entry)
+                        
+                        # Keep the pool live: the used offcut is gone and its guillotine remainders are free
+                        target_offcuts = [entry for entry in target_offcuts if entry[1] is not target_board]
+                        target_offcuts.extend(_upgrade_offcuts_on_board(target_board))
+                        offcuts_by_core[target_core] = target_offcuts
+                        offcut_dims_by_core[target_core] = _offcut_dimension_arrays(
+                            target_offcuts, board_codes, laminate_codes
+                        )
+                        normal_fit_matrix = None
+                        break  # Move to next part
     
     # Then try general relocations for space efficiency
+    # Decorated with (-area, index) so ordering is a plain tuple compare and ties keep board order
     all_parts = []
     for board in boards:
         for part in board.parts_on_board:
-            all_parts.append((part, board))
+            all_parts.append((-part.area, len(all_parts), part, board))
     
     # Sort parts by potential for improvement (larger parts first)
-    all_parts.sort(key=lambda x: x[0].requested_length * x[0].requested_width, reverse=True)
+    all_parts.sort()
     
-    for part, source_board in all_parts[:30]:  # Reduced limit after MDF priority
+    for _, _, part, source_board in all_parts[:30]:  # Reduced limit after MDF priority
         # Skip if this part was already processed in MDF upgrade
         if "18MDF" in source_board.material_details.core_name:
             continue
             
-        # Find better placement options
-        compatible_offcuts = global_inventory.find_compatible_offcuts(part, core_db, kerf)
+        # Find better placement options: upgrades only, on other boards
+        current_grade = global_inventory.get_grade_level(source_board.material_details.core_name, core_db)
+        compatible_offcuts = global_inventory.find_compatible_offcuts(
+            part, core_db, kerf, max_results=3,
+            exclude_board_id=source_board.id, min_target_grade=current_grade + 1
+        )
         
-        for offcut, target_board, rotated in compatible_offcuts[:3]:  # Check top 3 options
-            # Skip if it's the same board (no improvement)
-            if target_board.id == source_board.id:
-                continue
-            
-            # Calculate improvement potential
-            current_grade = get_grade_level(source_board.material_details.core_name, core_db)
-            target_grade = get_grade_level(offcut.material_details.core_name, core_db)
+        for offcut, target_board, rotated in compatible_offcuts:  # Check top 3 options
+            success = relocate_part_globally(
+                part, offcut, target_board, source_board, 
+                rotated, core_db, global_inventory, kerf
+            )
             
-            # Only relocate if there's an upgrade or significant space efficiency gain
-            if target_grade > current_grade:
-                success = relocate_part_globally(
-                    part, offcut, target_board, source_board, 
-                    rotated, core_db, global_inventory, kerf
-                )
-                
-                if success:
-                    relocations_made += 1
-                    log_entry = f"✓ Relocated {part.id} from {source_board.id} to {target_board.id}"
-                    log_entry += f" (upgrade: {source_board.material_details.core_name} → {offcut.material_details.core_name})"
-                    iteration_log.append(log_entry)
-                    logger.info(log_entry)
-                    break  # Found a good relocation, move to next part
+            if success:
+                relocations_made += 1
+                log_entry = f"✓ Relocated {part.id} from {source_board.id} to {target_board.id}"
+                log_entry += f" (upgrade: {source_board.material_details.core_name} → {offcut.material_details.core_name})"
+                iteration_log.append(log_entry)
+                logger.info(log_entry)
+                break  # Found a good relocation, move to next part
     
     # Remove empty boards
     remaining_boards = []
-    boards_removed = 0
+    removed_boards = []
     
     for board in boards:
         if len(board.parts_on_board) == 0:
-            boards_removed += 1
+            removed_boards.append(board)
+            global_inventory.remove_board(board)
             log_entry = f"✓ Eliminated empty board: {board.id}"
             iteration_log.append(log_entry)
             logger.info(log_entry)
@@ -336,7 +478,13 @@ def run_global_optimization_iteration(boards: List[Board], unplaced_parts: List[
             remaining_boards.append(board)
     
     final_waste = global_inventory.get_total_waste_area()
-    final_cost = calculate_total_order_cost(remaining_boards, core_db, laminate_db)
+    boards_removed = len(removed_boards)
+    
+    # Relocations keep every remaining board, so only eliminated boards change the cost
+    final_cost = initial_cost
+    if removed_boards:
+        final_cost -= calculate_total_order_cost(removed_boards, core_db, laminate_db)
+    cost_state['total_cost'] = final_cost
     
     iteration_log.append(f"Iteration complete: {parts_placed} unplaced parts placed, {relocations_made} relocations, {boards_removed} boards eliminated")
     iteration_log.append(f"Waste reduction: {(initial_waste - final_waste)/1000000:.2f}m², Cost reduction: ₹{initial_cost - final_cost:.2f}")
@@ -361,7 +509,7 @@ def run_global_optimization(parts_list: List[Part], core_db: Dict, laminate_db:
     
     # Phase 1: Initial optimization
     add_log_message("Phase 1: Initial optimization")
-    boards, unplaced_parts, upgrade_summary, initial_cost, _ = run_optimization(
+    boards, unplaced_parts, upgrade_summary, initial_cost, phase1_cost = run_optimization(
         parts_list, core_db, laminate_db, user_upgrade_sequence_str, kerf
     )
     
@@ -372,6 +520,14 @@ def run_global_optimization(parts_list: List[Part], core_db: Dict, laminate_db:
     logger.info("Phase 2: Iterative global optimization")
     iteration = 0
     max_iterations = 10
+    cost_state = {'total_cost': phase1_cost}
+    
+    # Parse upgrade sequence from string
+    upgrade_sequence_list = [core.strip() for core in user_upgrade_sequence_str.split(',') if core.strip()]
+    grade_map = _build_sequence_grade_map(upgrade_sequence_list)
+    
+    # One inventory for the whole run, updated incrementally by each iteration
+    global_inventory = _build_offcut_inventory(boards)
     
     while iteration < max_iterations:
         iteration += 1
@@ -380,17 +536,13 @@ def run_global_optimization(parts_list: List[Part], core_db: Dict, laminate_db:
         prev_board_count = len(boards)
         prev_unplaced_count = len(unplaced_parts)
         
-        # Parse upgrade sequence from string
-        upgrade_sequence_list = [core.strip() for core in user_upgrade_sequence_str.split(',') if core.strip()]
-        
         boards, unplaced_parts, improvements, iteration_log = run_global_optimization_iteration(
-            boards, unplaced_parts, core_db, laminate_db, kerf, upgrade_sequence_list
+            boards, unplaced_parts, core_db, laminate_db, kerf, upgrade_sequence_list,
+            cost_state=cost_state, grade_map=grade_map, global_inventory=global_inventory
         )
         
         # Add iteration results to main log
-        add_log_message(f"--- Iteration {iteration} ---")
-        for log_entry in iteration_log:
-            add_log_message(log_entry)
+        add_log_messages([f"--- Iteration {iteration} ---"] + iteration_log)
         
         # Check for convergence
         if improvements == 0:
@@ -401,6 +553,7 @@ def run_global_optimization(parts_list: List[Part], core_db: Dict, laminate_db:
             add_log_message(f"No structural changes in iteration {iteration} - stopping")
             break
     
+    # Full recalculation once at the end as the authoritative figure
     final_cost = calculate_total_order_cost(boards, core_db, laminate_db)
     
     add_log_message("=== FINAL RESULTS ===")
@@ -10,8 +10,13 @@ TEST 5 (duplicate) Algorithm - AMBP with Enhanced Guillotine Constraint Implemen
 """
 
 import logging
+import multiprocessing
+import os
 import time
-import copy
+import numpy as np
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+from operator import attrgetter
 from typing import List, Dict, Tuple, Optional, NamedTuple
 from data_models import Part, Board, MaterialDetails
 from dataclasses import dataclass
@@ -25,12 +30,14 @@ HOLE_FILL_THRESHOLD = 50.0  # mm - maximum hole size to fill
 EXACT_SOLVER_PART_LIMIT = 3  # Use CP-SAT when ≤3 parts remain
 EXACT_SOLVER_COVERAGE_THRESHOLD = 0.60  # 60% minimum sheet coverage
 EXACT_SOLVER_TIME_LIMIT = 60  # seconds
+PARALLEL_MIN_PARTS = 1000  # Spread material groups over worker processes only for jobs at least this large
 
 # Half-board optimization configuration
 HALF_BOARD_CONFIG = {
     'low_utilization_threshold': 40.0,  # Boards below this % are candidates for half-board optimization
     'target_offcut_percentage': 50.0,  # Target minimum offcut size as percentage of board area
     'max_processing_time': 120.0,  # Maximum time in seconds for half-board optimization
+    'parallel_min_boards': 200,  # Spread material groups over worker processes only with this many low-utilization boards
     'half_board_quantity': 0.5,  # Quantity to assign to saved half-boards
     'arrangement_strategies': [  # Different arrangement strategies to try
         'linear_horizontal',  # Arrange parts horizontally in lines
@@ -40,9 +47,12 @@ HALF_BOARD_CONFIG = {
     ]
 }
 
-@dataclass
+# Parts whose candidate positions are checked together in one broadcast while filling a board
+PLACEMENT_BATCH_SIZE = 64
+
+@dataclass(frozen=True, slots=True)
 class CutNode:
-    """Represents a node in the guillotine cut tree."""
+    """Represents an immutable node in the guillotine cut tree."""
     x: float
     y: float
     width: float
@@ -67,9 +77,6 @@ def run_max_utilisation_optimization(parts: List[Part], core_db: Dict, laminate_
     Max Utilisation optimization with enhanced guillotine constraint implementation.
     Maximizes board utilization while maintaining strict guillotine cutting constraints.
     """
-    print("🚨🚨🚨 MAX UTILISATION ALGORITHM CALLED 🚨🚨🚨")
-    print(f"🔍 DEBUG: Max Utilisation algorithm started with {len(parts)} parts")
-    logger.info(f"🔍 DEBUG: Max Utilisation algorithm started with {len(parts)} parts")
     logger.info(f"Starting Max Utilisation optimization with {len(parts)} parts")
     
     # Group parts by material signature for material segregation
@@ -81,11 +88,10 @@ def run_max_utilisation_optimization(parts: List[Part], core_db: Dict, laminate_
     final_cost = 0.0
     
     # Process each material group separately
+    boards_by_material = _optimize_material_groups(material_groups, core_db, laminate_db, kerf)
     for material_signature, group_parts in material_groups.items():
-        logger.info(f"Processing {len(group_parts)} parts for material: {material_signature}")
-        
-        # Create boards for this material group with strict material identity
-        group_boards = _optimize_material_group(group_parts, core_db, laminate_db, kerf, material_signature)
+        # Boards for this material group with strict material identity
+        group_boards = boards_by_material[material_signature]
         boards.extend(group_boards)
         
         # Check for unplaced parts
@@ -99,14 +105,11 @@ def run_max_utilisation_optimization(parts: List[Part], core_db: Dict, laminate_
                 unplaced_parts.append(part)
     
     # Apply half-board optimization for low-utilization boards
-    print(f"🔍 DEBUG: Starting half-board optimization with {len(boards)} boards")
-    logger.info("🔍 DEBUG: Starting half-board optimization for low-utilization boards...")
     logger.info("Starting half-board optimization for low-utilization boards...")
     logger.info(f"Checking {len(boards)} boards for half-board optimization (threshold: <{HALF_BOARD_CONFIG['low_utilization_threshold']}%)")
-    for board in boards:
-        utilization = board.get_utilization_percentage()
-        print(f"🔍 DEBUG: Board {board.id}: {utilization:.1f}% utilization")
-        logger.info(f"Board {board.id}: {utilization:.1f}% utilization")
+    if logger.isEnabledFor(logging.DEBUG):
+        for board in boards:
+            logger.debug(f"Board {board.id}: {board.get_utilization_percentage():.1f}% utilization")
     start_time = time.time()
     boards, half_board_savings = optimize_half_boards(boards, kerf, core_db, laminate_db)
     optimization_time = time.time() - start_time
@@ -121,22 +124,60 @@ def run_max_utilisation_optimization(parts: List[Part], core_db: Dict, laminate_
     logger.info(f"Max Utilisation optimization completed: {len(boards)} boards, {len(unplaced_parts)} unplaced")
     return boards, unplaced_parts, upgrade_summary, initial_cost, final_cost
 
+def _optimize_material_groups(material_groups: Dict[str, List[Part]], core_db: Dict, laminate_db: Dict,
+                              kerf: float) -> Dict[str, List[Board]]:
+    """
+    Optimize every material group. Groups are independent, so large jobs run them in worker
+    processes (largest first); their boards get the caller's parts back, placed as in the worker.
+    """
+    workers = min(len(material_groups), os.cpu_count() or 1)
+    total_parts = sum(len(group_parts) for group_parts in material_groups.values())
+    
+    if workers > 1 and total_parts >= PARALLEL_MIN_PARTS:
+        logger.info(f"Optimizing {len(material_groups)} material groups in {workers} worker processes")
+        try:
+            # spawn rather than fork: the Streamlit host process is multi-threaded
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+                futures = {
+                    material_signature: executor.submit(_optimize_material_group, group_parts, core_db, laminate_db,
+                                                        kerf, material_signature)
+                    for material_signature, group_parts in sorted(material_groups.items(), key=lambda item: -len(item[1]))
+                }
+                return {material_signature: _adopt_original_parts(future.result(), material_groups[material_signature])
+                        for material_signature, future in futures.items()}
+        except Exception as e:
+            logger.warning(f"Parallel material group optimization failed, running serially: {e}")
+    
+    boards_by_material = {}
+    for material_signature, group_parts in material_groups.items():
+        logger.info(f"Processing {len(group_parts)} parts for material: {material_signature}")
+        boards_by_material[material_signature] = _optimize_material_group(group_parts, core_db, laminate_db, kerf, material_signature)
+    return boards_by_material
+
+def _adopt_original_parts(boards: List[Board], parts: List[Part]) -> List[Board]:
+    """Swap the worker's copies of the parts on these boards for the caller's parts, recording their placements."""
+    originals = {part.id: part for part in parts}
+    for board in boards:
+        for i, placed in enumerate(board.parts_on_board):
+            original = originals[placed.id]
+            _record_placement(original, placed.x_pos, placed.y_pos, placed.actual_length, placed.actual_width,
+                              placed.rotated)
+            board.parts_on_board[i] = original
+    return boards
+
 def _group_parts_by_material(parts: List[Part]) -> Dict[str, List[Part]]:
     """Group parts by their complete material signature to maintain strict material segregation."""
     groups = {}
     
     for part in parts:
-        # Use the complete material details string for strict segregation
-        material_str = str(part.material_details)
-        
         # Extract the full material signature to prevent mixing
-        if hasattr(part, 'original_data') and part.original_data:
+        original_data = getattr(part, 'original_data', None)
+        if original_data and 'ORIGINAL MATERIAL' in original_data:
             # Use original material from CSV for exact matching
-            original_material = part.original_data.get('ORIGINAL MATERIAL', material_str)
-            signature = original_material
+            signature = original_data['ORIGINAL MATERIAL']
         else:
-            # Fallback to material details string
-            signature = material_str
+            # Fallback to the complete material details string for strict segregation
+            signature = str(part.material_details)
         
         if signature not in groups:
             groups[signature] = []
@@ -151,15 +192,18 @@ def _optimize_material_group(parts: List[Part], core_db: Dict, laminate_db: Dict
         return []
     
     # Sort parts by area (largest first) for better packing
-    sorted_parts = sorted(parts, key=lambda p: p.requested_length * p.requested_width, reverse=True)
+    sorted_parts = sorted(parts, key=attrgetter('area'), reverse=True)
     
     boards = []
-    remaining_parts = sorted_parts.copy()
+    remaining_parts = sorted_parts  # Rebound to a filtered list per board, never mutated
+    
+    # Every board in the group shares one signature, so its core and dimensions are resolved once
+    board_spec = _get_board_spec(sorted_parts[0].material_details, core_db, material_signature)
     
     while remaining_parts:
         # Create new board for this specific material signature
         material_details = remaining_parts[0].material_details
-        board = _create_board_for_material(material_details, core_db, kerf, material_signature)
+        board = _create_board_for_material(material_details, core_db, kerf, material_signature, board_spec)
         
         # Place parts on this board using strict guillotine algorithm
         placed_on_board = _place_parts_on_board_guillotine(remaining_parts, board, kerf)
@@ -167,17 +211,31 @@ def _optimize_material_group(parts: List[Part], core_db: Dict, laminate_db: Dict
         if placed_on_board:
             boards.append(board)
             # Remove placed parts from remaining
-            remaining_parts = [p for p in remaining_parts if p.id not in {part.id for part in placed_on_board}]
+            placed_ids = {part.id for part in placed_on_board}
+            remaining_parts = [p for p in remaining_parts if p.id not in placed_ids]
             logger.info(f"Created board with {len(placed_on_board)} parts for material: {material_signature}")
         else:
             # If no parts could be placed, break to avoid infinite loop
             logger.warning("No parts could be placed on new board - breaking")
             break
     
+    # Enforce sacrificial sheet policy (F3)
+    _enforce_sacrificial_policy(boards, material_signature)
+    
     return boards
 
-def _create_board_for_material(material_details: MaterialDetails, core_db: Dict, kerf: float, material_signature: Optional[str] = None) -> Board:
-    """Create a board with proper dimensions from core database."""
+def _create_board_for_material(material_details: MaterialDetails, core_db: Dict, kerf: float, material_signature: Optional[str] = None,
+                               board_spec: Optional[Tuple[str, float, float]] = None) -> Board:
+    """Create a board with proper dimensions from core database, or from an already resolved board spec."""
+    core_name, length, width = board_spec or _get_board_spec(material_details, core_db, material_signature)
+    
+    # Create board ID that includes material signature for clarity
+    material_suffix = material_signature[:20] if material_signature else (core_name or "Unknown")
+    board_id = f"Board_{core_name or 'Unknown'}_{material_suffix}"
+    return Board(board_id, material_details, length, width, kerf)
+
+def _get_board_spec(material_details: MaterialDetails, core_db: Dict, material_signature: Optional[str] = None) -> Tuple[str, float, float]:
+    """Resolve the core name and board dimensions for a material from the core database."""
     
     # Extract core material name from multiple sources
     core_name = None
@@ -229,10 +287,7 @@ def _create_board_for_material(material_details: MaterialDetails, core_db: Dict,
         logger.warning(f"Core '{core_name}' not found in database. Available cores: {list(core_db.keys())}")
         length, width = 2420, 1200  # Default dimensions
     
-    # Create board ID that includes material signature for clarity
-    material_suffix = material_signature[:20] if material_signature else (core_name or "Unknown")
-    board_id = f"Board_{core_name or 'Unknown'}_{material_suffix}"
-    return Board(board_id, material_details, length, width, kerf)
+    return core_name, length, width
 
 def _place_parts_on_board_guillotine(parts: List[Part], board: Board, kerf: float) -> List[Part]:
     """
@@ -240,43 +295,42 @@ def _place_parts_on_board_guillotine(parts: List[Part], board: Board, kerf: floa
     Uses proper bin packing to fit multiple parts on one board.
     """
     placed_parts = []
+    separable_groups = set()  # Part groups already shown to be guillotine-separable on this board
     
     # Sort parts by area (largest first) for better packing efficiency
-    sorted_parts = sorted(parts, key=lambda p: p.requested_length * p.requested_width, reverse=True)
-    
-    # Try to place each part on the board
-    for part in sorted_parts:
-        # Check if board has enough remaining area
-        remaining_area = board.get_remaining_area()
-        part_area = part.requested_length * part.requested_width
-        
-        if part_area > remaining_area:
-            continue  # Skip if part won't fit
-        
-        # Try normal orientation first
-        if _try_place_part_with_collision_check(part, board, kerf, rotated=False):
-            placed_parts.append(part)
-            logger.debug(f"Placed part {part.id} (normal orientation)")
-            continue
+    sorted_parts = sorted(parts, key=attrgetter('area'), reverse=True)
+    
+    # One row per part orientation, normal first and rotated next when rotation is allowed (grains == 0)
+    lengths = np.array([part.requested_length for part in sorted_parts], dtype=float)
+    widths = np.array([part.requested_width for part in sorted_parts], dtype=float)
+    row_lengths = np.column_stack((lengths, widths)).ravel()
+    row_widths = np.column_stack((widths, lengths)).ravel()
+    row_allowed = np.column_stack((np.ones(len(sorted_parts), dtype=bool),
+                                   np.array([part.grains == 0 for part in sorted_parts], dtype=bool))).ravel()
+    areas = np.array([part.area for part in sorted_parts], dtype=float)
+    
+    # Parts are tried in order and the board only fills up, so the search resumes after each placed part
+    log_placements = logger.isEnabledFor(logging.DEBUG)
+    next_index = 0
+    while next_index < len(sorted_parts):
+        placement = _find_next_placement(board, kerf, next_index, row_lengths, row_widths, row_allowed, areas,
+                                         separable_groups)
+        if placement is None:
+            break
         
-        # Try rotated orientation if allowed and normal failed
-        if part.grains == 0:  # Rotation allowed
-            if _try_place_part_with_collision_check(part, board, kerf, rotated=True):
-                placed_parts.append(part)
-                logger.debug(f"Placed part {part.id} (rotated)")
-                continue
-    
-    # Apply strip merging for narrow columns (F2)
-    if placed_parts:
-        _merge_narrow_strips(board, kerf)
-    
-    # Enforce sacrificial sheet policy (F3)
-    _enforce_sacrificial_policy(board)
+        row, x, y = placement
+        part, rotated = sorted_parts[row // 2], bool(row % 2)
+        _commit_placement(part, board, kerf, x, y, row_lengths[row].item(), row_widths[row].item(), rotated)
+        placed_parts.append(part)
+        if log_placements:
+            logger.debug(f"Placed part {part.id} ({'rotated' if rotated else 'normal orientation'})")
+        next_index = row // 2 + 1
     
     logger.info(f"Placed {len(placed_parts)}/{len(parts)} parts on board {board.id}")
     return placed_parts
 
-def _try_place_part_with_collision_check(part: Part, board: Board, kerf: float, rotated: bool) -> bool:
+def _try_place_part_with_collision_check(part: Part, board: Board, kerf: float, rotated: bool,
+                                         separable_groups: Optional[set] = None) -> bool:
     """Try to place part with proper collision detection and multiple placement attempts."""
     
     # Get dimensions for this orientation
@@ -292,133 +346,271 @@ def _try_place_part_with_collision_check(part: Part, board: Board, kerf: float,
         return False
     
     # Generate candidate positions using shelf-based placement
-    candidate_positions = _generate_shelf_positions(board, part_length, part_width, kerf)
-    
-    # Try each position until we find one that works
-    for x, y in candidate_positions:
-        if _is_position_collision_free(x, y, part_length, part_width, board, kerf):
-            # Place the part
-            setattr(part, 'x', x)
-            setattr(part, 'y', y)
-            part.x_pos = x
-            part.y_pos = y
-            setattr(part, 'rotated', rotated)
-            board.parts_on_board.append(part)
+    candidate_xs, candidate_ys = _generate_shelf_positions(board, part_length, part_width, kerf)
+    
+    # Try each collision-free position until one also keeps the layout guillotine-cuttable
+    for x, y in _collision_free_positions(candidate_xs, candidate_ys, part_length, part_width, board, kerf):
+        if _validate_guillotine_constraints(x, y, part_length, part_width, board, separable_groups):
+            _commit_placement(part, board, kerf, x, y, part_length, part_width, rotated)
             return True
     
     return False
 
-def _generate_shelf_positions(board: Board, part_length: float, part_width: float, kerf: float) -> List[Tuple[float, float]]:
-    """Generate candidate positions using bottom-left-fill and shelf algorithms."""
+def _find_next_placement(board: Board, kerf: float, first_part: int, row_lengths: np.ndarray, row_widths: np.ndarray,
+                         row_allowed: np.ndarray, areas: np.ndarray,
+                         separable_groups: set) -> Optional[Tuple[int, float, float]]:
+    """
+    Find the first part orientation row, from first_part on, that fits the board, with its position.
+    Gives the same result as trying _try_place_part_with_collision_check on each part in turn, but
+    checks the shelf and skyline candidates of a batch of parts against the placed parts in one broadcast.
+    """
+    ex_x, ex_y, ex_length, ex_width = _get_placed_rects(board).T
+    skyline = _get_skyline(board, kerf)
+    step_x = np.array([step[0] for step in skyline])
+    step_height = np.array([step[1] for step in skyline])
+    
+    # Shelf candidates: right of, above and diagonal to each placed part (same for every part)
+    right_x = ex_x + ex_length + kerf
+    top_y = ex_y + ex_width + kerf
+    shelf_x = np.concatenate((right_x, ex_x, right_x))
+    shelf_y = np.concatenate((ex_y, top_y, top_y))
+    
+    # Skyline candidates: a part starting at step i rests on the highest step it spans, so
+    # span_max[i, j] holds the highest of steps i..j
+    steps = np.arange(len(skyline))
+    span_max = np.maximum.accumulate(np.where(steps >= steps[:, np.newaxis], step_height, -np.inf), axis=1)
+    
+    placed_planes = [column[:, np.newaxis, np.newaxis] for column in (ex_x, ex_y, ex_length, ex_width)]
+    remaining_area = board.get_remaining_area()
+    
+    # Rows of the same shape share every candidate and guillotine result, so a shape that fails once is skipped
+    failed_shapes = set()
+    for start in range(2 * first_part, len(row_lengths), 2 * PLACEMENT_BATCH_SIZE):
+        rows = slice(start, start + 2 * PLACEMENT_BATCH_SIZE)
+        lengths = row_lengths[rows, np.newaxis]
+        widths = row_widths[rows, np.newaxis]
+        allowed = row_allowed[rows] & np.repeat(areas[start // 2:start // 2 + PLACEMENT_BATCH_SIZE] <= remaining_area, 2)
+        if not allowed.any():
+            continue
+        
+        span_end = np.searchsorted(step_x, step_x + lengths, side='left') - 1
+        xs = np.concatenate((np.broadcast_to(shelf_x, (len(lengths), len(shelf_x))),
+                             np.broadcast_to(step_x, span_end.shape)), axis=1)
+        ys = np.concatenate((np.broadcast_to(shelf_y, (len(lengths), len(shelf_y))),
+                             span_max[steps, span_end]), axis=1)
+        
+        # Bounds and kerf separation from every placed part, as one (parts, rows, candidates) mask.
+        # Placed parts lead so the reduction runs over whole contiguous planes, not a short inner axis
+        in_bounds = (xs >= 0) & (ys >= 0) & (xs + lengths <= board.total_length) & (ys + widths <= board.total_width)
+        separated = _parts_are_separated(xs, ys, lengths, widths, *placed_planes, kerf)
+        free = in_bounds & separated.all(axis=0) & allowed[:, np.newaxis]
+        
+        # Try each row's free candidates bottom-left first until one keeps the layout guillotine-cuttable
+        for row in np.flatnonzero(free.any(axis=1)):
+            shape = (lengths[row, 0].item(), widths[row, 0].item())
+            if shape in failed_shapes:
+                continue
+            candidates = np.flatnonzero(free[row])
+            for candidate in candidates[np.lexsort((xs[row, candidates], ys[row, candidates]))]:
+                x, y = xs[row, candidate].item(), ys[row, candidate].item()
+                if _validate_guillotine_constraints(x, y, *shape, board, separable_groups):
+                    return start + row, x, y
+            failed_shapes.add(shape)
     
-    positions = []
+    return None
+
+def _commit_placement(part: Part, board: Board, kerf: float, x: float, y: float,
+                      part_length: float, part_width: float, rotated: bool) -> None:
+    """Place a part at a checked position and update the board's rectangle array and skyline."""
+    _record_placement(part, x, y, part_length, part_width, rotated)
+    skyline = _get_skyline(board, kerf)
+    board.parts_on_board.append(part)
+    _sync_arrays(board)
+    _raise_skyline(skyline, x, x + part_length + kerf, y + part_width + kerf, board.total_length)
+    board._skyline_part_count = len(board.parts_on_board)
+
+def _record_placement(part: Part, x: float, y: float, part_length: float, part_width: float, rotated: bool = False) -> None:
+    """Record a part's position, orientation and placed dimensions, as read by _placed_rect and the reports."""
+    part.x = x
+    part.y = y
+    part.x_pos = x
+    part.y_pos = y
+    part.rotated = rotated
+    part.actual_length = part_length
+    part.actual_width = part_width
+
+def _placed_rect(part: Part) -> Tuple[float, float, float, float]:
+    """Get a placed part's x, y, length and width in its placed orientation, as written by _record_placement."""
+    return part.x_pos, part.y_pos, part.actual_length, part.actual_width
+
+def _sync_arrays(board: Board) -> None:
+    """
+    Append rectangles for newly placed parts to the board's (capacity, 4) array, growing it as needed,
+    and keep their bounding box (min x, min y, max right, max top) up to date. The caches are rebuilt,
+    and the guillotine rejects dropped, when parts were removed or parts_on_board was replaced.
+    """
+    count = len(board.parts_on_board)
+    rects = board._rect_xywh
+    synced = board._rect_count
+    
+    if rects is None or synced > count or board._rect_parts is not board.parts_on_board:
+        rects, synced = np.empty((max(count, 16), 4)), 0
+        board._rect_parts = board.parts_on_board
+        board._rect_bounds = [float('inf'), float('inf'), float('-inf'), float('-inf')]
+        board._guillotine_rejects = set()
+        board._skyline = None
+    elif count > len(rects):
+        grown = np.empty((max(count, 2 * len(rects)), 4))
+        grown[:synced] = rects[:synced]
+        rects = grown
+    
+    bounds = board._rect_bounds
+    for i in range(synced, count):
+        x, y, length, width = rects[i] = _placed_rect(board.parts_on_board[i])
+        bounds[:] = min(bounds[0], x), min(bounds[1], y), max(bounds[2], x + length), max(bounds[3], y + width)
+    
+    board._rect_xywh = rects
+    board._rect_count = count
+
+def _get_placed_rects(board: Board) -> np.ndarray:
+    """Get the board's placed parts as an (n, 4) array of x, y, length, width."""
+    count = len(board.parts_on_board)
+    if board._rect_count != count or board._rect_parts is not board.parts_on_board:
+        _sync_arrays(board)
+    return board._rect_xywh[:count]
+
+def _get_skyline(board: Board, kerf: float) -> List[List[float]]:
+    """
+    Get the board's skyline as [x, height] steps (each step runs to the next one, the last to
+    the board edge). Rebuilt from the placed parts when parts were added outside this module.
+    """
+    placed_rects = _get_placed_rects(board)  # Also drops the skyline if parts_on_board was replaced
+    skyline = board._skyline
+    if skyline is not None and board._skyline_part_count == len(board.parts_on_board):
+        return skyline
+    
+    skyline = [[0.0, 0.0]]
+    for ex_x, ex_y, ex_length, ex_width in placed_rects.tolist():
+        _raise_skyline(skyline, ex_x, ex_x + ex_length + kerf, ex_y + ex_width + kerf, board.total_length)
+    
+    board._skyline = skyline
+    board._skyline_part_count = len(board.parts_on_board)
+    return skyline
+
+def _raise_skyline(skyline: List[List[float]], x_start: float, x_end: float, height: float, board_length: float) -> None:
+    """Raise the skyline to at least height over [x_start, x_end), merging equal neighbouring steps."""
+    x_end = min(x_end, board_length)
+    if x_end <= x_start:
+        return
+    
+    # Split steps at the footprint edges, then raise every step inside it
+    breakpoints = {step[0] for step in skyline}
+    breakpoints.add(x_start)
+    if x_end < board_length:
+        breakpoints.add(x_end)
+    
+    raised = []
+    step_index = 0
+    for x in sorted(breakpoints):
+        while step_index + 1 < len(skyline) and skyline[step_index + 1][0] <= x:
+            step_index += 1
+        step_height = skyline[step_index][1]
+        if x_start <= x < x_end:
+            step_height = max(step_height, height)
+        if raised and raised[-1][1] == step_height:
+            continue
+        raised.append([x, step_height])
     
+    skyline[:] = raised
+
+def _generate_shelf_positions(board: Board, part_length: float, part_width: float, kerf: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Generate candidate positions using bottom-left-fill, shelf and skyline algorithms, as x and y
+    arrays in bottom-left order.
+    """
     # If board is empty, start at origin
     if not board.parts_on_board:
-        positions.append((0.0, 0.0))
-        return positions
+        return np.zeros(1), np.zeros(1)
     
     # Generate positions based on existing parts (shelf algorithm)
-    for existing_part in board.parts_on_board:
-        ex_x = getattr(existing_part, 'x', getattr(existing_part, 'x_pos', 0))
-        ex_y = getattr(existing_part, 'y', getattr(existing_part, 'y_pos', 0))
-        
-        # Get existing part dimensions
-        if getattr(existing_part, 'rotated', False):
-            ex_length = existing_part.requested_width
-            ex_width = existing_part.requested_length
-        else:
-            ex_length = existing_part.requested_length
-            ex_width = existing_part.requested_width
-        
-        # Right edge position (vertical stacking)
-        right_x = ex_x + ex_length + kerf
-        if right_x + part_length <= board.total_length:
-            positions.append((right_x, ex_y))
-        
-        # Top edge position (horizontal stacking) 
-        top_y = ex_y + ex_width + kerf
-        if top_y + part_width <= board.total_width:
-            positions.append((ex_x, top_y))
-        
-        # Bottom-left corner after this part
-        if right_x + part_length <= board.total_length and top_y + part_width <= board.total_width:
-            positions.append((right_x, top_y))
-    
-    # Add grid-based positions as fallback
-    grid_step = 50  # 50mm grid
-    for y in range(0, int(board.total_width - part_width + 1), grid_step):
-        for x in range(0, int(board.total_length - part_length + 1), grid_step):
-            positions.append((float(x), float(y)))
+    ex_x, ex_y, ex_length, ex_width = _get_placed_rects(board).T
+    right_x = ex_x + ex_length + kerf
+    top_y = ex_y + ex_width + kerf
+    fits_right = right_x + part_length <= board.total_length
+    fits_top = top_y + part_width <= board.total_width
+    fits_corner = fits_right & fits_top
+    
+    # Skyline positions: at each skyline step, the lowest y clearing everything the part spans
+    skyline = _get_skyline(board, kerf)
+    step_x = np.array([step[0] for step in skyline])
+    step_height = np.array([step[1] for step in skyline])
+    steps = np.arange(len(skyline))
+    span_end = np.searchsorted(step_x, step_x + part_length, side='left') - 1
+    span_max = np.maximum.accumulate(np.where(steps >= steps[:, np.newaxis], step_height, -np.inf), axis=1)
+    sky_y = np.maximum(span_max[steps, span_end], 0.0)
+    fits_sky = (step_x + part_length <= board.total_length) & (sky_y + part_width <= board.total_width)
+    
+    # Right edge (vertical stacking), top edge (horizontal stacking), the corner after each part, then skyline
+    xs = np.concatenate((right_x[fits_right], ex_x[fits_top], right_x[fits_corner], step_x[fits_sky]))
+    ys = np.concatenate((ex_y[fits_right], top_y[fits_top], top_y[fits_corner], sky_y[fits_sky]))
     
     # Sort by bottom-left preference (y first, then x)
-    positions.sort(key=lambda pos: (pos[1], pos[0]))
-    
-    return positions
+    order = np.lexsort((xs, ys))
+    return xs[order], ys[order]
 
-def _is_position_collision_free(x: float, y: float, part_length: float, part_width: float, board: Board, kerf: float) -> bool:
-    """Check if position is free of collisions and maintains guillotine constraints."""
-    
-    # Check bounds
-    if x < 0 or y < 0 or x + part_length > board.total_length or y + part_width > board.total_width:
-        return False
-    
-    # Check collision with all existing parts
-    for existing_part in board.parts_on_board:
-        ex_x = getattr(existing_part, 'x', getattr(existing_part, 'x_pos', 0))
-        ex_y = getattr(existing_part, 'y', getattr(existing_part, 'y_pos', 0))
-        
-        # Get existing part dimensions
-        if getattr(existing_part, 'rotated', False):
-            ex_length = existing_part.requested_width
-            ex_width = existing_part.requested_length
-        else:
-            ex_length = existing_part.requested_length
-            ex_width = existing_part.requested_width
-        
-        # Check for overlap with kerf spacing
-        if not (_parts_are_separated(x, y, part_length, part_width, ex_x, ex_y, ex_length, ex_width, kerf)):
-            return False
-    
-    # CRITICAL: Check guillotine constraints with all existing parts
-    if not _validate_guillotine_constraints(x, y, part_length, part_width, board):
-        return False
-    
-    return True
+def _collision_free_positions(xs: np.ndarray, ys: np.ndarray, part_length: float, part_width: float,
+                              board: Board, kerf: float) -> List[Tuple[float, float]]:
+    """Filter candidate positions, in order, to those in bounds and kerf-separated from every placed part."""
+    # Check bounds for all candidates at once
+    in_bounds = (xs >= 0) & (ys >= 0) & (xs + part_length <= board.total_length) & (ys + part_width <= board.total_width)
+    
+    # Check collision of every candidate with every existing part as one (parts, candidates) mask
+    ex_x, ex_y, ex_length, ex_width = _get_placed_rects(board).T[..., np.newaxis]
+    separated = _parts_are_separated(xs, ys, part_length, part_width, ex_x, ex_y, ex_length, ex_width, kerf)
+    
+    free = in_bounds & separated.all(axis=0)
+    return list(zip(xs[free].tolist(), ys[free].tolist()))
 
-def _validate_guillotine_constraints(new_x: float, new_y: float, new_length: float, new_width: float, board: Board) -> bool:
+def _validate_guillotine_constraints(new_x: float, new_y: float, new_length: float, new_width: float, board: Board,
+                                     separable_groups: Optional[set] = None) -> bool:
     """
     Validate that placing a new part maintains guillotine cutting constraints.
     All parts must be separable by straight cuts (no L-shaped patterns).
+    separable_groups memoises separable part groups across checks while one board is filled.
     """
     
     if len(board.parts_on_board) == 0:
         return True  # First part is always valid
     
-    # Create temporary part list including the new part
-    temp_parts = []
+    # A part wholly outside the placed parts' bounding box is split off by one straight cut, and the
+    # placed parts were validated as each went on, so the rest is already known to be separable
+    placed_rects = _get_placed_rects(board)
+    min_x, min_y, max_right, max_top = board._rect_bounds
+    if (new_x >= max_right or new_y >= max_top or
+            new_x + new_length <= min_x or new_y + new_width <= min_y):
+        return True
     
-    # Add existing parts
-    for part in board.parts_on_board:
-        part_x = getattr(part, 'x', getattr(part, 'x_pos', 0))
-        part_y = getattr(part, 'y', getattr(part, 'y_pos', 0))
-        
-        if getattr(part, 'rotated', False):
-            part_length = part.requested_width
-            part_width = part.requested_length
-        else:
-            part_length = part.requested_length
-            part_width = part.requested_width
-            
-        temp_parts.append((part_x, part_y, part_length, part_width))
+    # A layout that is not guillotine-cuttable stays so as parts are added, so a rejected
+    # placement is rejected for good on this board - most collision-free candidates are
+    new_rect = (new_x, new_y, new_length, new_width)
+    if new_rect in board._guillotine_rejects:
+        return False
+    
+    # Create temporary part list including the new part
+    temp_parts = list(map(tuple, placed_rects.tolist()))
     
     # Add the new part
-    temp_parts.append((new_x, new_y, new_length, new_width))
+    temp_parts.append(new_rect)
     
     # Check if all parts can be separated by straight cuts
-    return _can_separate_with_straight_cuts(temp_parts)
+    if not _can_separate_with_straight_cuts(temp_parts, board.total_length, board.total_width, separable_groups):
+        board._guillotine_rejects.add(new_rect)
+        return False
+    return True
 
-def _can_separate_with_straight_cuts(parts: List[Tuple[float, float, float, float]]) -> bool:
+def _can_separate_with_straight_cuts(parts: List[Tuple[float, float, float, float]],
+                                    board_length: Optional[float] = None, board_width: Optional[float] = None,
+                                    separable_groups: Optional[set] = None) -> bool:
     """
     Check if all parts can be separated using only straight cuts (guillotine constraint).
     This prevents L-shaped cutting patterns that violate manufacturing constraints.
@@ -428,120 +620,83 @@ def _can_separate_with_straight_cuts(parts: List[Tuple[float, float, float, floa
         return True
     
     # Try to find a straight cut (vertical or horizontal) that separates parts
-    # Use dynamic board dimensions from the actual board being analyzed
-    board_length = max([x + w for x, y, w, h in parts] + [2440])  # Get actual board length
-    board_width = max([y + h for x, y, w, h in parts] + [1220])   # Get actual board width
-    return _recursive_guillotine_check(parts, 0, 0, board_length, board_width)
+    # Use the actual board dimensions when known, else the parts' extent (at least a standard sheet)
+    if board_length is None:
+        board_length = max(2440, max(x + w for x, y, w, h in parts))
+    if board_width is None:
+        board_width = max(1220, max(y + h for x, y, w, h in parts))
+    return _recursive_guillotine_check(parts, 0, 0, board_length, board_width, separable_groups)
 
 def _recursive_guillotine_check(parts: List[Tuple[float, float, float, float]], 
-                               rect_x: float, rect_y: float, rect_w: float, rect_h: float) -> bool:
+                               rect_x: float, rect_y: float, rect_w: float, rect_h: float,
+                               separable_groups: Optional[set] = None) -> bool:
     """
-    Recursively check if parts in a rectangle can be separated by guillotine cuts.
+    Check if parts in a rectangle can be separated by guillotine cuts.
+    Uses an explicit stack of part groups instead of recursion. Groups in separable_groups are
+    skipped, and groups found separable are added to it when the whole check passes.
     """
+    if separable_groups is None:
+        separable_groups = set()
+    
+    # Filter parts that are within this rectangle; groups below are sorted slices of this one list
+    rect_parts = [(x, y, w, h) for x, y, w, h in parts
+                  if x >= rect_x and y >= rect_y and x + w <= rect_x + rect_w and y + h <= rect_y + rect_h]
+    
+    # Any straight cut that crosses no part keeps both sides guillotine-separable if the
+    # whole group is, so the first valid cut decides each group - no backtracking needed.
+    # Groups untouched by the newest part recur across candidates, so known-separable ones are skipped
+    pending = [rect_parts]
+    checked_groups = []
+    while pending:
+        group = pending.pop()
+        if len(group) <= 1:
+            continue  # Single part or empty rectangle is always valid
+        
+        group_key = frozenset(group)
+        if group_key in separable_groups:
+            continue
+        
+        split = _find_guillotine_split(group)
+        if split is None:
+            return False  # No valid cut found
+        checked_groups.append(group_key)
+        pending.extend(split)
     
-    # Filter parts that are within this rectangle
-    rect_parts = []
-    for x, y, w, h in parts:
-        if (x >= rect_x and y >= rect_y and 
-            x + w <= rect_x + rect_w and y + h <= rect_y + rect_h):
-            rect_parts.append((x, y, w, h))
-    
-    if len(rect_parts) <= 1:
-        return True  # Single part or empty rectangle is always valid
-    
-    # Try vertical cuts
-    for x, y, w, h in rect_parts:
-        # Try cut at left edge
-        cut_x = x
-        if _try_vertical_cut(rect_parts, cut_x, rect_x, rect_y, rect_w, rect_h):
-            return True
-            
-        # Try cut at right edge  
-        cut_x = x + w
-        if _try_vertical_cut(rect_parts, cut_x, rect_x, rect_y, rect_w, rect_h):
-            return True
-    
-    # Try horizontal cuts
-    for x, y, w, h in rect_parts:
-        # Try cut at bottom edge
-        cut_y = y
-        if _try_horizontal_cut(rect_parts, cut_y, rect_x, rect_y, rect_w, rect_h):
-            return True
-            
-        # Try cut at top edge
-        cut_y = y + h
-        if _try_horizontal_cut(rect_parts, cut_y, rect_x, rect_y, rect_w, rect_h):
-            return True
-    
-    return False  # No valid cut found
-
-def _try_vertical_cut(parts: List[Tuple[float, float, float, float]], cut_x: float,
-                     rect_x: float, rect_y: float, rect_w: float, rect_h: float) -> bool:
-    """Try a vertical cut and check if both sides can be recursively separated."""
-    
-    if cut_x <= rect_x or cut_x >= rect_x + rect_w:
-        return False
-    
-    left_parts = []
-    right_parts = []
-    
-    for x, y, w, h in parts:
-        if x + w <= cut_x:
-            left_parts.append((x, y, w, h))
-        elif x >= cut_x:
-            right_parts.append((x, y, w, h))
-        else:
-            return False  # Part crosses the cut line
-    
-    # Both sides must be non-empty for a valid cut
-    if not left_parts or not right_parts:
-        return False
-    
-    # Recursively check both sides
-    left_ok = _recursive_guillotine_check(left_parts, rect_x, rect_y, cut_x - rect_x, rect_h)
-    right_ok = _recursive_guillotine_check(right_parts, cut_x, rect_y, rect_x + rect_w - cut_x, rect_h)
-    
-    return left_ok and right_ok
+    separable_groups.update(checked_groups)
+    return True
 
-def _try_horizontal_cut(parts: List[Tuple[float, float, float, float]], cut_y: float,
-                       rect_x: float, rect_y: float, rect_w: float, rect_h: float) -> bool:
-    """Try a horizontal cut and check if both sides can be recursively separated."""
-    
-    if cut_y <= rect_y or cut_y >= rect_y + rect_h:
-        return False
-    
-    bottom_parts = []
-    top_parts = []
-    
-    for x, y, w, h in parts:
-        if y + h <= cut_y:
-            bottom_parts.append((x, y, w, h))
-        elif y >= cut_y:
-            top_parts.append((x, y, w, h))
-        else:
-            return False  # Part crosses the cut line
-    
-    # Both sides must be non-empty for a valid cut
-    if not bottom_parts or not top_parts:
-        return False
-    
-    # Recursively check both sides
-    bottom_ok = _recursive_guillotine_check(bottom_parts, rect_x, rect_y, rect_w, cut_y - rect_y)
-    top_ok = _recursive_guillotine_check(top_parts, rect_x, cut_y, rect_w, rect_y + rect_h - cut_y)
+def _find_guillotine_split(parts: List[Tuple[float, float, float, float]]) -> Optional[Tuple[List, List]]:
+    """Find a vertical or horizontal straight cut crossing no part, returning both non-empty sides."""
+    
+    # Try vertical cuts: sweep parts by left edge, cut where no earlier part reaches past the next one
+    by_x = sorted(parts)
+    max_right = by_x[0][0] + by_x[0][2]
+    for i in range(1, len(by_x)):
+        if max_right <= by_x[i][0]:
+            return by_x[:i], by_x[i:]
+        max_right = max(max_right, by_x[i][0] + by_x[i][2])
+    
+    # Try horizontal cuts the same way on bottom edges
+    by_y = sorted(parts, key=lambda part: part[1])
+    max_top = by_y[0][1] + by_y[0][3]
+    for i in range(1, len(by_y)):
+        if max_top <= by_y[i][1]:
+            return by_y[:i], by_y[i:]
+        max_top = max(max_top, by_y[i][1] + by_y[i][3])
     
-    return bottom_ok and top_ok
+    return None
 
-def _parts_are_separated(x1: float, y1: float, w1: float, h1: float, 
-                        x2: float, y2: float, w2: float, h2: float, kerf: float) -> bool:
-    """Check if two parts are properly separated by kerf distance."""
+def _parts_are_separated(x1, y1, w1: float, h1: float, 
+                        x2: np.ndarray, y2: np.ndarray, w2: np.ndarray, h2: np.ndarray, kerf: float) -> np.ndarray:
+    """Check if parts are properly separated by kerf distance, broadcasting positions against the arrays."""
     
     # Check horizontal separation
-    horizontal_sep = (x1 + w1 + kerf <= x2) or (x2 + w2 + kerf <= x1)
+    horizontal_sep = (x1 + w1 + kerf <= x2) | (x2 + w2 + kerf <= x1)
     
     # Check vertical separation
-    vertical_sep = (y1 + h1 + kerf <= y2) or (y2 + h2 + kerf <= y1)
+    vertical_sep = (y1 + h1 + kerf <= y2) | (y2 + h2 + kerf <= y1)
     
-    return horizontal_sep or vertical_sep
+    return horizontal_sep | vertical_sep
 
 def _try_place_with_cut_tree(part: Part, cut_tree: CutNode, board: Board, kerf: float, rotated: bool) -> Optional[Tuple]:
     """
@@ -577,14 +732,14 @@ def _find_cut_tree_position(length: float, width: float, cut_tree: CutNode, boar
     Find a valid position for a part using cut-tree constraints.
     Returns (x, y, new_cut_tree) if position found.
     """
-    # Simple implementation: try bottom-left placement first
-    for y in range(0, int(board.total_width - width + 1), 10):  # 10mm grid
-        for x in range(0, int(board.total_length - length + 1), 10):
-            if _is_position_valid_for_cut_tree(x, y, length, width, cut_tree, kerf):
-                # Create new cut tree with this placement
-                new_tree = _insert_part_in_cut_tree(cut_tree, x, y, length, width, kerf)
-                if new_tree:
-                    return (x, y, new_tree)
+    # Try bottom-left placement first, over the shelf and skyline corners of the board's parts
+    candidate_xs, candidate_ys = _generate_shelf_positions(board, length, width, kerf)
+    for x, y in zip(candidate_xs.tolist(), candidate_ys.tolist()):
+        if _is_position_valid_for_cut_tree(x, y, length, width, cut_tree, kerf):
+            # Create new cut tree with this placement
+            new_tree = _insert_part_in_cut_tree(cut_tree, x, y, length, width, kerf)
+            if new_tree:
+                return (x, y, new_tree)
     
     return None
 
@@ -604,15 +759,7 @@ def _cut_tree_has_overlap(node: CutNode, x: float, y: float, length: float, widt
     
     if node.part:  # Leaf node with a part
         # Check overlap with existing part
-        part_x = getattr(node.part, 'x', getattr(node.part, 'x_pos', 0))
-        part_y = getattr(node.part, 'y', getattr(node.part, 'y_pos', 0))
-        
-        if getattr(node.part, 'rotated', False):
-            part_length = node.part.requested_width
-            part_width = node.part.requested_length
-        else:
-            part_length = node.part.requested_length  
-            part_width = node.part.requested_width
+        part_x, part_y, part_length, part_width = _placed_rect(node.part)
         
         # Check for kerf-aware overlap
         return not (x + length + kerf <= part_x or part_x + part_length + kerf <= x or
@@ -630,15 +777,8 @@ def _cut_tree_has_overlap(node: CutNode, x: float, y: float, length: float, widt
 def _insert_part_in_cut_tree(tree: CutNode, x: float, y: float, length: float, width: float, kerf: float) -> Optional[CutNode]:
     """Insert a part into the cut tree, maintaining guillotine constraints."""
     
-    # For simplicity, create a basic cut tree structure
-    # In a full implementation, this would recursively split the tree
-    
-    # Create new tree copy
-    import copy
-    new_tree = copy.deepcopy(tree)
-    
-    # For now, just validate that the placement is valid
-    return new_tree if tree else None
+    # The tree is not split yet; nodes are immutable, so the unchanged tree is returned as is
+    return tree if tree else None
 
 def _validate_cut_tree_placement(cut_tree: CutNode, board: Board, kerf: float) -> bool:
     """Validate that the cut tree represents a valid guillotine layout."""
@@ -648,65 +788,28 @@ def _validate_cut_tree_placement(cut_tree: CutNode, board: Board, kerf: float) -
 def _verify_cut_tree_overlaps(x: float, y: float, length: float, width: float, board: Board, kerf: float) -> bool:
     """Verify no overlaps with existing parts on board."""
     
-    # Check against all existing parts
-    for existing_part in board.parts_on_board:
-        ex_x = getattr(existing_part, 'x', getattr(existing_part, 'x_pos', 0))
-        ex_y = getattr(existing_part, 'y', getattr(existing_part, 'y_pos', 0))
-        
-        # Get existing part dimensions
-        if getattr(existing_part, 'rotated', False):
-            ex_length = existing_part.requested_width
-            ex_width = existing_part.requested_length
-        else:
-            ex_length = existing_part.requested_length
-            ex_width = existing_part.requested_width
-        
-        # Check for overlap with kerf spacing
-        if not (x + length + kerf <= ex_x or ex_x + ex_length + kerf <= x or
-                y + width + kerf <= ex_y or ex_y + ex_width + kerf <= y):
-            return False  # Overlap detected
-    
-    return True  # No overlaps
-
-def _merge_narrow_strips(board: Board, kerf: float) -> None:
-    """
-    Merge narrow strips (F2) - strips narrower than STRIP_MERGE_THRESHOLD.
-    This helps maintain guillotine constraints by reducing fragmentation.
-    """
-    # Implementation would analyze board layout and merge narrow columns
-    # For now, just log the action
-    logger.debug(f"Strip merging applied to board {board.id}")
+    # Check against all existing parts with kerf spacing
+    ex_x, ex_y, ex_length, ex_width = _get_placed_rects(board).T
+    return bool(_parts_are_separated(x, y, length, width, ex_x, ex_y, ex_length, ex_width, kerf).all())
 
-def _enforce_sacrificial_policy(board: Board) -> None:
+def _enforce_sacrificial_policy(boards: List[Board], material_signature: str) -> None:
     """
     Enforce sacrificial sheet policy (F3) - maximum 1 sacrificial sheet per material,
-    all others must be ≥80% utilization.
+    all others must be ≥80% utilization. Runs once over a material group's finished boards.
     """
-    utilization = board.get_utilization_percentage()
+    sacrificial = [board for board in boards
+                   if board.get_utilization_percentage() < SACRIFICIAL_UTILIZATION_THRESHOLD * 100]
     
-    if utilization < SACRIFICIAL_UTILIZATION_THRESHOLD * 100:
-        logger.debug(f"Board {board.id} utilization {utilization:.1f}% - potential sacrificial sheet")
+    if len(sacrificial) > 1:
+        logger.debug(f"{len(sacrificial)} boards below {SACRIFICIAL_UTILIZATION_THRESHOLD:.0%} utilization for material: {material_signature}")
     
-    # In full implementation, this would enforce the policy across material groups
+    # In full implementation, this would repack so that at most one sacrificial sheet remains
 
 def _check_basic_guillotine_compliance(part1: Part, part2: Part) -> bool:
     """Basic check for guillotine compliance between two parts."""
     
-    x1 = getattr(part1, 'x', getattr(part1, 'x_pos', 0))
-    y1 = getattr(part1, 'y', getattr(part1, 'y_pos', 0))
-    x2 = getattr(part2, 'x', getattr(part2, 'x_pos', 0))
-    y2 = getattr(part2, 'y', getattr(part2, 'y_pos', 0))
-    
-    # Get dimensions
-    if getattr(part1, 'rotated', False):
-        w1, h1 = part1.requested_width, part1.requested_length
-    else:
-        w1, h1 = part1.requested_length, part1.requested_width
-        
-    if getattr(part2, 'rotated', False):
-        w2, h2 = part2.requested_width, part2.requested_length
-    else:
-        w2, h2 = part2.requested_length, part2.requested_width
+    x1, y1, w1, h1 = _placed_rect(part1)
+    x2, y2, w2, h2 = _placed_rect(part2)
     
     # Check if parts can be separated by a straight cut
     # Horizontal separation (vertical cut possible)
@@ -755,21 +858,14 @@ def _try_orientation_guillotine(part: Part, board: Board, kerf: float, rotated:
     # Find valid position using guillotine shelf algorithm
     position = _find_guillotine_position(part_length, part_width, board, kerf)
     
-    if position is not None:
-        x, y = position
-        
-        # CRITICAL: Verify no overlaps before placing
-        if _verify_no_overlaps(x, y, part_length, part_width, board, kerf):
-            # Place the part
-            setattr(part, 'x', x)
-            setattr(part, 'y', y)
-            part.x_pos = x
-            part.y_pos = y
-            setattr(part, 'rotated', rotated)
-            board.parts_on_board.append(part)
-            return True
+    if position is None:
+        return False
     
-    return False
+    # The position already passed the kerf-spaced overlap check against every placed part
+    x, y = position
+    _record_placement(part, x, y, part_length, part_width, rotated)
+    board.parts_on_board.append(part)
+    return True
 
 def _find_guillotine_position(part_length: float, part_width: float, board: Board, kerf: float) -> Optional[Tuple[float, float]]:
     """Find position that respects guillotine constraints."""
@@ -778,80 +874,43 @@ def _find_guillotine_position(part_length: float, part_width: float, board: Boar
     if not board.parts_on_board:
         return (0.0, 0.0)
     
-    # Get all possible shelf positions
-    shelf_positions = _get_shelf_positions(board, kerf)
-    
-    # Try each shelf position
-    for x, y in shelf_positions:
-        # Check if part fits at this position
-        if (x + part_length <= board.total_length and 
-            y + part_width <= board.total_width):
-            
-            # Check for collisions with exact kerf spacing
-            if _verify_no_overlaps(x, y, part_length, part_width, board, kerf):
-                return (x, y)
-    
-    return None
+    # Check every shelf position for fit and kerf-spaced collisions at once, taking the first free one
+    shelf_xs, shelf_ys = _get_shelf_positions(board, kerf)
+    free_positions = _collision_free_positions(shelf_xs, shelf_ys, part_length, part_width, board, kerf)
+    return free_positions[0] if free_positions else None
 
-def _get_shelf_positions(board: Board, kerf: float) -> List[Tuple[float, float]]:
-    """Get all valid shelf positions for efficient guillotine placement."""
-    
-    positions = [(0.0, 0.0)]  # Origin
-    
-    for part in board.parts_on_board:
-        part_x = getattr(part, 'x', getattr(part, 'x_pos', 0))
-        part_y = getattr(part, 'y', getattr(part, 'y_pos', 0))
-        
-        # Get actual dimensions considering rotation
-        if getattr(part, 'rotated', False):
-            part_length = part.requested_width
-            part_width = part.requested_length
-        else:
-            part_length = part.requested_length
-            part_width = part.requested_width
-        
-        # Add standard shelf positions with proper kerf spacing
-        positions.extend([
-            (part_x + part_length + kerf, part_y),           # Right of part
-            (part_x, part_y + part_width + kerf),            # Above part
-            (part_x + part_length + kerf, part_y + part_width + kerf),  # Diagonal
-        ])
-    
-    # Remove duplicates and sort by bottom-left preference for efficiency
-    unique_positions = list(set(positions))
-    return sorted(unique_positions, key=lambda pos: (pos[1], pos[0]))
+def _get_shelf_positions(board: Board, kerf: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Get all valid shelf positions for efficient guillotine placement, as x and y arrays."""
+    
+    # Placed rectangles already carry each part's rotation
+    ex_x, ex_y, ex_length, ex_width = _get_placed_rects(board).T
+    right_x = ex_x + ex_length + kerf
+    top_y = ex_y + ex_width + kerf
+    
+    # Origin, then right of, above and diagonal to each part, with proper kerf spacing
+    xs = np.concatenate(([0.0], right_x, ex_x, right_x))
+    ys = np.concatenate(([0.0], ex_y, top_y, top_y))
+    
+    # Sort by bottom-left preference, then drop each position equal to the one before it
+    order = np.lexsort((xs, ys))
+    xs, ys = xs[order], ys[order]
+    is_new = np.ones(len(xs), dtype=bool)
+    is_new[1:] = (xs[1:] != xs[:-1]) | (ys[1:] != ys[:-1])
+    return xs[is_new], ys[is_new]
 
 def _verify_no_overlaps(x: float, y: float, length: float, width: float, board: Board, kerf: float) -> bool:
     """Verify that placing a part at given position creates NO overlaps with basic guillotine check."""
     
-    # Part boundaries (actual part size)
-    part_x1, part_y1 = x, y
-    part_x2, part_y2 = x + length, y + width
+    # Parts must be separated by at least kerf distance from every placed rectangle
+    placed_rects = _get_placed_rects(board)
     
-    # Check against all existing parts
-    for existing_part in board.parts_on_board:
-        ex_x = getattr(existing_part, 'x', getattr(existing_part, 'x_pos', 0))
-        ex_y = getattr(existing_part, 'y', getattr(existing_part, 'y_pos', 0))
-        
-        # Get existing part dimensions
-        if getattr(existing_part, 'rotated', False):
-            ex_length = existing_part.requested_width
-            ex_width = existing_part.requested_length
-        else:
-            ex_length = existing_part.requested_length
-            ex_width = existing_part.requested_width
-        
-        # Existing part boundaries
-        ex_x1, ex_y1 = ex_x, ex_y
-        ex_x2, ex_y2 = ex_x + ex_length, ex_y + ex_width
-        
-        # Check for overlap with kerf spacing
-        # Parts must be separated by at least kerf distance
-        if not (part_x2 + kerf <= ex_x1 or ex_x2 + kerf <= part_x1 or
-                part_y2 + kerf <= ex_y1 or ex_y2 + kerf <= part_y1):
-            return False  # Overlap detected
+    # Broad phase: a part kerf-clear of the placed parts' bounding box is clear of all of them
+    min_x, min_y, max_right, max_top = board._rect_bounds
+    if x + length + kerf <= min_x or max_right + kerf <= x or y + width + kerf <= min_y or max_top + kerf <= y:
+        return True
     
-    return True  # No overlaps detected
+    ex_x, ex_y, ex_length, ex_width = placed_rects.T
+    return bool(_parts_are_separated(x, y, length, width, ex_x, ex_y, ex_length, ex_width, kerf).all())
 
 # Half-board optimization functions
 def optimize_half_boards(boards: List[Board], kerf: float, core_db: Dict, laminate_db: Dict) -> Tuple[List[Board], List[Dict]]:
@@ -863,64 +922,156 @@ def optimize_half_boards(boards: List[Board], kerf: float, core_db: Dict, lamina
     start_time = time.time()
     max_time = HALF_BOARD_CONFIG['max_processing_time']
     
-    optimized_boards = []
-    half_board_savings = []
-    
-    # Group boards by material type for consolidation
+    # Group boards by material type for consolidation, working out each board's utilization once
     material_board_groups = {}
+    utilization = {}
+    log_boards = logger.isEnabledFor(logging.INFO)
     for board in boards:
         material_key = _get_board_material_key(board)
-        logger.info(f"Board {board.id}: utilization={board.get_utilization_percentage():.1f}%, material_key='{material_key}'")
+        utilization[id(board)] = board.get_utilization_percentage()
+        if log_boards:
+            logger.info(f"Board {board.id}: utilization={utilization[id(board)]:.1f}%, material_key='{material_key}'")
         if material_key not in material_board_groups:
             material_board_groups[material_key] = []
         material_board_groups[material_key].append(board)
     
     logger.info(f"Grouped into {len(material_board_groups)} material groups: {list(material_board_groups.keys())}")
     
-    for material_key, material_boards in material_board_groups.items():
+    # Each material group as (material_key, boards, their utilization percentages)
+    group_tasks = [(material_key, material_boards, [utilization[id(b)] for b in material_boards])
+                   for material_key, material_boards in material_board_groups.items()]
+    
+    low_util_count = sum(value < HALF_BOARD_CONFIG['low_utilization_threshold'] for value in utilization.values())
+    if not low_util_count:
+        logger.info("No low-utilization boards - nothing to rearrange")
+        return [board for _, material_boards, _ in group_tasks for board in material_boards], []
+    
+    workers = min(len(group_tasks), os.cpu_count() or 1)
+    if workers > 1 and low_util_count >= HALF_BOARD_CONFIG['parallel_min_boards']:
+        group_results = _optimize_half_board_groups_parallel(group_tasks, workers, kerf, core_db, laminate_db, start_time, max_time)
+        if group_results is not None:
+            optimized_boards = []
+            half_board_savings = []
+            for group_boards, group_savings in group_results:
+                optimized_boards.extend(group_boards)
+                half_board_savings.extend(group_savings)
+            return optimized_boards, half_board_savings
+    
+    optimized_boards = []
+    half_board_savings = []
+    threshold = HALF_BOARD_CONFIG['low_utilization_threshold']
+    for material_key, material_boards, utilizations in group_tasks:
+        # Groups with no low-utilization board pass straight through
+        if min(utilizations) >= threshold:
+            optimized_boards.extend(material_boards)
+            continue
+        
         # Check time limit
         if time.time() - start_time > max_time:
             logger.warning(f"Half-board optimization time limit reached ({max_time}s)")
             optimized_boards.extend(material_boards)
             continue
         
-        # Find low-utilization boards for this material
-        low_util_boards = [b for b in material_boards if b.get_utilization_percentage() < HALF_BOARD_CONFIG['low_utilization_threshold']]
-        high_util_boards = [b for b in material_boards if b.get_utilization_percentage() >= HALF_BOARD_CONFIG['low_utilization_threshold']]
-        
-        if len(low_util_boards) >= 2:
-            logger.info(f"Found {len(low_util_boards)} low-utilization boards for material: {material_key}")
-            logger.info(f"DISABLING board consolidation - only using single-board rearrangement as per user requirements")
-            # Note: Board consolidation logic disabled - user wants only rearrangement optimization
-            for single_board in low_util_boards:
-                logger.info(f"Testing board {single_board.id} with {single_board.get_utilization_percentage():.1f}% utilization for rearrangement")
-                optimized_single, saved_material = _optimize_board_arrangement_for_offcut(single_board, kerf, core_db, laminate_db)
-                if optimized_single and saved_material:
-                    optimized_boards.append(optimized_single)
-                    half_board_savings.append(saved_material)
-                    logger.info(f"✅ Board {single_board.id} successfully rearranged to create 50%+ offcut - reporting as 0.5 material")
-                else:
-                    optimized_boards.append(single_board)
-                    logger.info(f"❌ Board {single_board.id} rearrangement failed - keeping original layout, no half-board savings")
-            optimized_boards.extend(high_util_boards)
-        elif len(low_util_boards) >= 1:
-            # Try to optimize low-utilization boards by rearranging to create 50%+ offcuts
-            logger.info(f"Attempting rearrangement optimization for {len(low_util_boards)} low-utilization boards of material: {material_key}")
-            for single_board in low_util_boards:
-                logger.info(f"Testing board {single_board.id} with {single_board.get_utilization_percentage():.1f}% utilization for rearrangement")
-                optimized_single, saved_material = _optimize_board_arrangement_for_offcut(single_board, kerf, core_db, laminate_db)
-                if optimized_single and saved_material:
-                    # ONLY count as half-board if rearrangement was successful AND created 50%+ offcut
-                    optimized_boards.append(optimized_single)
-                    half_board_savings.append(saved_material)
-                    logger.info(f"✅ Board {single_board.id} successfully rearranged to create 50%+ offcut - reporting as 0.5 material")
-                else:
-                    # Rearrangement failed - keep original board, do NOT count as half-board
-                    optimized_boards.append(single_board)
-                    logger.info(f"❌ Board {single_board.id} rearrangement failed - keeping original layout, no half-board savings")
-            optimized_boards.extend(high_util_boards)
+        group_boards, group_savings = _optimize_half_board_group(material_key, material_boards, utilizations,
+                                                                 kerf, core_db, laminate_db)
+        optimized_boards.extend(group_boards)
+        half_board_savings.extend(group_savings)
+    
+    return optimized_boards, half_board_savings
+
+def _optimize_half_board_groups_parallel(group_tasks: List[Tuple[str, List[Board], List[float]]], workers: int, kerf: float,
+                                         core_db: Dict, laminate_db: Dict, start_time: float,
+                                         max_time: float) -> Optional[List[Tuple[List[Board], List[Dict]]]]:
+    """
+    Run the half-board pass for each material group in worker processes, returning the groups' results
+    in order, or None if the pool fails. As in the serial pass, a group starts only while time remains
+    (here once a worker is free) and a started group always finishes; groups not started keep their boards.
+    """
+    logger.info(f"Optimizing half-boards for {len(group_tasks)} material groups in {workers} worker processes")
+    threshold = HALF_BOARD_CONFIG['low_utilization_threshold']
+    group_results = [None] * len(group_tasks)
+    started = {}  # Future -> position of its group in group_tasks
+    try:
+        # spawn rather than fork: the Streamlit host process is multi-threaded
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            running = set()
+            for position, (material_key, material_boards, utilizations) in enumerate(group_tasks):
+                # Groups with no low-utilization board pass straight through
+                if min(utilizations) >= threshold:
+                    group_results[position] = (material_boards, [])
+                    continue
+                
+                if len(running) >= workers:
+                    _, running = wait(running, return_when=FIRST_COMPLETED)
+                
+                # Check time limit
+                if time.time() - start_time > max_time:
+                    logger.warning(f"Half-board optimization time limit reached ({max_time}s)")
+                    group_results[position] = (material_boards, [])
+                    continue
+                
+                future = executor.submit(_optimize_half_board_group_in_worker, material_key, material_boards,
+                                         utilizations, kerf, core_db, laminate_db)
+                started[future] = position
+                running.add(future)
+            
+            for future, position in started.items():
+                kept_boards, group_savings = future.result()
+                material_boards = group_tasks[position][1]
+                group_results[position] = ([material_boards[board] if isinstance(board, int) else board
+                                            for board in kept_boards], group_savings)
+        return group_results
+    except Exception as e:
+        logger.warning(f"Parallel half-board optimization failed, running serially: {e}")
+        return None
+
+def _optimize_half_board_group_in_worker(material_key: str, material_boards: List[Board], utilizations: List[float],
+                                         kerf: float, core_db: Dict, laminate_db: Dict) -> Tuple[List, List[Dict]]:
+    """
+    Run _optimize_half_board_group in a worker process. Boards it keeps unchanged are returned as their
+    positions in material_boards, so the caller puts back its own boards instead of the worker's copies.
+    """
+    positions = {id(board): i for i, board in enumerate(material_boards)}
+    group_boards, group_savings = _optimize_half_board_group(material_key, material_boards, utilizations,
+                                                             kerf, core_db, laminate_db)
+    return [positions.get(id(board), board) for board in group_boards], group_savings
+
+def _optimize_half_board_group(material_key: str, material_boards: List[Board], utilizations: List[float], kerf: float,
+                               core_db: Dict, laminate_db: Dict) -> Tuple[List[Board], List[Dict]]:
+    """Rearrange one material group's low-utilization boards, given their utilization percentages."""
+    optimized_boards = []
+    half_board_savings = []
+    
+    # Find low-utilization boards for this material
+    threshold = HALF_BOARD_CONFIG['low_utilization_threshold']
+    low_util_boards = [(b, u) for b, u in zip(material_boards, utilizations) if u < threshold]
+    high_util_boards = [b for b, u in zip(material_boards, utilizations) if u >= threshold]
+    
+    if not low_util_boards:
+        return list(material_boards), half_board_savings
+    
+    if len(low_util_boards) >= 2:
+        logger.info(f"Found {len(low_util_boards)} low-utilization boards for material: {material_key}")
+        logger.info(f"DISABLING board consolidation - only using single-board rearrangement as per user requirements")
+        # Note: Board consolidation logic disabled - user wants only rearrangement optimization
+    else:
+        # Try to optimize low-utilization boards by rearranging to create 50%+ offcuts
+        logger.info(f"Attempting rearrangement optimization for {len(low_util_boards)} low-utilization boards of material: {material_key}")
+    
+    for single_board, single_utilization in low_util_boards:
+        logger.info(f"Testing board {single_board.id} with {single_utilization:.1f}% utilization for rearrangement")
+        optimized_single, saved_material = _optimize_board_arrangement_for_offcut(single_board, kerf, core_db, laminate_db,
+                                                                                  single_utilization)
+        if optimized_single and saved_material:
+            # ONLY count as half-board if rearrangement was successful AND created 50%+ offcut
+            optimized_boards.append(optimized_single)
+            half_board_savings.append(saved_material)
+            logger.info(f"✅ Board {single_board.id} successfully rearranged to create 50%+ offcut - reporting as 0.5 material")
         else:
-            optimized_boards.extend(material_boards)
+            # Rearrangement failed - keep original board, do NOT count as half-board
+            optimized_boards.append(single_board)
+            logger.info(f"❌ Board {single_board.id} rearrangement failed - keeping original layout, no half-board savings")
+    optimized_boards.extend(high_util_boards)
     
     return optimized_boards, half_board_savings
 
@@ -986,10 +1137,15 @@ def _create_half_board_arrangement(parts: List[Part], material_details: Material
         standard_length = float(core_data.get('standard_length', 2440))
         standard_width = float(core_data.get('standard_width', 1220))
     
-    # Try different half-board dimension combinations
+    # Try different half-board dimension combinations, each with the parts largest first
     best_board = None
+    best_positions = []
     best_utilization = 0
+    sorted_parts = sorted(parts, key=attrgetter('area'), reverse=True)
     
+    # Every option holds the same parts, so utilization is known before packing; rank the options
+    # by it (earlier options first on ties) so only the best ones that fit need simulating
+    options = []
     for length_factor, width_factor in HALF_BOARD_CONFIG['half_board_dimension_options']:
         # Calculate half-board dimensions
         half_length = standard_length * length_factor
@@ -1005,71 +1161,69 @@ def _create_half_board_arrangement(parts: List[Part], material_details: Material
             kerf=kerf
         )
         
-        # Try to place all parts on this half-board
-        placed_parts = []
-        current_x, current_y = 0.0, 0.0
-        shelf_height = 0.0
-        
-        # Sort parts by area (largest first)
-        sorted_parts = sorted(parts, key=lambda p: p.requested_length * p.requested_width, reverse=True)
-        
-        all_parts_fit = True
-        for part in sorted_parts:
-            part_length = part.requested_length
-            part_width = part.requested_width
-            
-            # Check if part fits on current shelf
-            if current_x + part_length <= half_length:
-                # Place on current shelf
-                part_copy = copy.deepcopy(part)
-                part_copy.x_pos = current_x
-                part_copy.y_pos = current_y
-                setattr(part_copy, 'x', current_x)
-                setattr(part_copy, 'y', current_y)
-                
-                placed_parts.append(part_copy)
-                current_x += part_length + kerf
-                shelf_height = max(shelf_height, part_width)
-            else:
-                # Move to next shelf
-                current_y += shelf_height + kerf
-                current_x = 0.0
-                shelf_height = part_width
-                
-                # Check if part fits on new shelf
-                if current_y + part_width <= half_width and current_x + part_length <= half_length:
-                    part_copy = copy.deepcopy(part)
-                    part_copy.x_pos = current_x
-                    part_copy.y_pos = current_y
-                    setattr(part_copy, 'x', current_x)
-                    setattr(part_copy, 'y', current_y)
-                    
-                    placed_parts.append(part_copy)
-                    current_x += part_length + kerf
-                else:
-                    # Part doesn't fit - try next configuration
-                    all_parts_fit = False
-                    break
-        
-        if all_parts_fit and placed_parts:
-            # Add placed parts to test board
-            test_board.parts_on_board = placed_parts
-            
-            # Calculate utilization
-            utilization = test_board.get_utilization_percentage()
-            
-            # Check if this is the best configuration so far
-            if utilization > best_utilization and utilization <= 60.0:  # Max 60% for half-board
-                best_board = test_board
-                best_utilization = utilization
+        # Utilization only reads the parts' sizes, so the originals stand in until a winner is placed
+        test_board.parts_on_board = sorted_parts
+        utilization = test_board.get_utilization_percentage()
+        if 0 < utilization <= 60.0:  # Max 60% for half-board
+            options.append((utilization, test_board))
+    options.sort(key=lambda option: option[0], reverse=True)
+    
+    for utilization, test_board in options:
+        # Try to place all parts on this half-board; positions are only turned into placed parts for the winner
+        positions = _simulate_half_board_shelves(sorted_parts, test_board.total_length, test_board.total_width, kerf)
+        if positions:
+            best_board = test_board
+            best_positions = positions
+            best_utilization = utilization
+            break
     
     if best_board:
+        placed_parts = []
+        for part, (x, y) in zip(sorted_parts, best_positions):
+            part_copy = part.clone_for_placement()
+            _record_placement(part_copy, x, y, part.requested_length, part.requested_width)
+            placed_parts.append(part_copy)
+        best_board.parts_on_board = placed_parts
+        
         # Generate unique board ID
         best_board.id = f"HalfBoard_{core_name}_{len(best_board.parts_on_board)}parts_{best_utilization:.1f}pct"
         logger.info(f"Created half-board arrangement: {best_board.total_length:.0f}x{best_board.total_width:.0f}mm, utilization: {best_utilization:.1f}%")
     
     return best_board
 
+def _simulate_half_board_shelves(sorted_parts: List[Part], half_length: float, half_width: float,
+                                 kerf: float) -> Optional[List[Tuple[float, float]]]:
+    """Shelf-pack the parts in order on a half-board, returning each part's (x, y), or None if they do not all fit."""
+    positions = []
+    current_x, current_y = 0.0, 0.0
+    shelf_height = 0.0
+    
+    for part in sorted_parts:
+        part_length = part.requested_length
+        part_width = part.requested_width
+        
+        # Check if part fits on current shelf
+        if current_x + part_length <= half_length:
+            # Place on current shelf
+            positions.append((current_x, current_y))
+            current_x += part_length + kerf
+            shelf_height = max(shelf_height, part_width)
+        else:
+            # Move to next shelf
+            current_y += shelf_height + kerf
+            current_x = 0.0
+            shelf_height = part_width
+            
+            # Check if part fits on new shelf
+            if current_y + part_width <= half_width and current_x + part_length <= half_length:
+                positions.append((current_x, current_y))
+                current_x += part_length + kerf
+            else:
+                # Part doesn't fit - try next configuration
+                return None
+    
+    return positions
+
 def _create_half_board_material_record(board: Board, core_db: Dict, laminate_db: Dict) -> Dict:
     """
     Create a record for the saved half-board material.
@@ -1114,26 +1268,38 @@ def _get_board_material_key(board: Board) -> str:
 
 def _extract_core_name_from_material(material_details: MaterialDetails, core_db: Dict) -> str:
     """Extract core material name from material details."""
-    material_str = str(material_details)
-    
-    for core_name in core_db.keys():
+    return _find_core_name(str(material_details), tuple(core_db))
+
+@lru_cache(maxsize=256)
+def _find_core_name(material_str: str, core_names: Tuple[str, ...]) -> str:
+    """Get the first core name contained in the material string, cached since boards share few materials."""
+    for core_name in core_names:
         if core_name in material_str:
             return core_name
     
     return "Unknown"
 
-def _optimize_board_arrangement_for_offcut(board: Board, kerf: float, core_db: Dict, laminate_db: Dict) -> Tuple[Optional[Board], Optional[Dict]]:
+def _optimize_board_arrangement_for_offcut(board: Board, kerf: float, core_db: Dict, laminate_db: Dict,
+                                          utilization: Optional[float] = None) -> Tuple[Optional[Board], Optional[Dict]]:
     """
     Rearrange parts on a low-utilization board to create a single offcut ≥50% of board area.
     Only returns success if rearrangement creates the required offcut size.
+    utilization is the board's utilization percentage when the caller has already worked it out.
     """
-    if not board.parts_on_board or board.get_utilization_percentage() >= HALF_BOARD_CONFIG['low_utilization_threshold']:
-        logger.info(f"Board {board.id} does not qualify for half-board optimization (utilization: {board.get_utilization_percentage():.1f}%)")
+    if utilization is None:
+        utilization = board.get_utilization_percentage()
+    if not board.parts_on_board or utilization >= HALF_BOARD_CONFIG['low_utilization_threshold']:
+        logger.info(f"Board {board.id} does not qualify for half-board optimization (utilization: {utilization:.1f}%)")
         return None, None
     
     board_area = board.total_length * board.total_width
     target_offcut_area = board_area * (HALF_BOARD_CONFIG['target_offcut_percentage'] / 100.0)
     
+    # The offcut cannot overlap the parts, so no arrangement helps when they leave less than the target free
+    if board_area * utilization / 100.0 > board_area - target_offcut_area:
+        logger.info(f"Board {board.id} parts leave less than {HALF_BOARD_CONFIG['target_offcut_percentage']}% of the board free - skipping rearrangement")
+        return None, None
+    
     logger.info(f"Testing board {board.id}: {len(board.parts_on_board)} parts, need to create ≥{HALF_BOARD_CONFIG['target_offcut_percentage']}% offcut ({target_offcut_area:.0f} mm²)")
     
     # Try different arrangement strategies
@@ -1155,12 +1321,11 @@ def _optimize_board_arrangement_for_offcut(board: Board, kerf: float, core_db: D
                     saved_material = _create_half_board_material_record(board, core_db, laminate_db)
                     
                     # Log coordinates for debugging PDF layout
-                    logger.info(f"✅ SUCCESS: Board {board.id} rearranged from {board.get_utilization_percentage():.1f}% to create {offcut_percentage:.1f}% offcut")
-                    logger.info(f"Rearranged board {rearranged_board.id} has {len(rearranged_board.parts_on_board)} parts with NEW coordinates:")
-                    for i, part in enumerate(rearranged_board.parts_on_board[:3]):  # Log first 3 parts
-                        x_pos = getattr(part, 'x_pos', getattr(part, 'x', 0))
-                        y_pos = getattr(part, 'y_pos', getattr(part, 'y', 0))
-                        logger.info(f"  Part {i+1} ({part.id}): NEW position ({x_pos}, {y_pos})")
+                    logger.info(f"✅ SUCCESS: Board {board.id} rearranged from {utilization:.1f}% to create {offcut_percentage:.1f}% offcut")
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info(f"Rearranged board {rearranged_board.id} has {len(rearranged_board.parts_on_board)} parts with NEW coordinates:")
+                        for i, part in enumerate(rearranged_board.parts_on_board[:3]):  # Log first 3 parts
+                            logger.info(f"  Part {i+1} ({part.id}): NEW position ({part.x_pos}, {part.y_pos})")
                     return rearranged_board, saved_material
                 else:
                     logger.info(f"Strategy {strategy} failed: offcut {offcut_percentage:.1f}% < required {HALF_BOARD_CONFIG['target_offcut_percentage']}%")
@@ -1188,7 +1353,7 @@ def _try_arrangement_strategy(board: Board, strategy: str, kerf: float, target_o
     )
     
     # Get parts to rearrange (make copies to avoid modifying originals)
-    parts_to_place = [copy.deepcopy(part) for part in board.parts_on_board]
+    parts_to_place = [part.clone_for_placement() for part in board.parts_on_board]
     
     # Try the specified arrangement strategy
     success = False
@@ -1212,7 +1377,7 @@ def _arrange_parts_linear_horizontal(board: Board, parts: List[Part], kerf: floa
     row_height = 0.0
     
     # Sort parts by width (tallest first) to minimize rows
-    sorted_parts = sorted(parts, key=lambda p: p.requested_width, reverse=True)
+    sorted_parts = sorted(parts, key=attrgetter('requested_width'), reverse=True)
     
     for part in sorted_parts:
         part_length = part.requested_length
@@ -1221,10 +1386,7 @@ def _arrange_parts_linear_horizontal(board: Board, parts: List[Part], kerf: floa
         # Check if part fits on current row
         if current_x + part_length <= board.total_length:
             # Place on current row
-            part.x_pos = current_x
-            part.y_pos = current_y
-            setattr(part, 'x', current_x)
-            setattr(part, 'y', current_y)
+            _record_placement(part, current_x, current_y, part_length, part_width)
             
             board.parts_on_board.append(part)
             current_x += part_length + kerf
@@ -1238,10 +1400,7 @@ def _arrange_parts_linear_horizontal(board: Board, parts: List[Part], kerf: floa
             # Check if part fits on new row
             if (current_y + part_width <= board.total_width and 
                 current_x + part_length <= board.total_length):
-                part.x_pos = current_x
-                part.y_pos = current_y
-                setattr(part, 'x', current_x)
-                setattr(part, 'y', current_y)
+                _record_placement(part, current_x, current_y, part_length, part_width)
                 
                 board.parts_on_board.append(part)
                 current_x += part_length + kerf
@@ -1257,7 +1416,7 @@ def _arrange_parts_linear_vertical(board: Board, parts: List[Part], kerf: float)
     column_width = 0.0
     
     # Sort parts by length (longest first) to minimize columns
-    sorted_parts = sorted(parts, key=lambda p: p.requested_length, reverse=True)
+    sorted_parts = sorted(parts, key=attrgetter('requested_length'), reverse=True)
     
     for part in sorted_parts:
         part_length = part.requested_length
@@ -1266,10 +1425,7 @@ def _arrange_parts_linear_vertical(board: Board, parts: List[Part], kerf: float)
         # Check if part fits in current column
         if current_y + part_width <= board.total_width:
             # Place in current column
-            part.x_pos = current_x
-            part.y_pos = current_y
-            setattr(part, 'x', current_x)
-            setattr(part, 'y', current_y)
+            _record_placement(part, current_x, current_y, part_length, part_width)
             
             board.parts_on_board.append(part)
             current_y += part_width + kerf
@@ -1283,10 +1439,7 @@ def _arrange_parts_linear_vertical(board: Board, parts: List[Part], kerf: float)
             # Check if part fits in new column
             if (current_x + part_length <= board.total_length and 
                 current_y + part_width <= board.total_width):
-                part.x_pos = current_x
-                part.y_pos = current_y
-                setattr(part, 'x', current_x)
-                setattr(part, 'y', current_y)
+                _record_placement(part, current_x, current_y, part_length, part_width)
                 
                 board.parts_on_board.append(part)
                 current_y += part_width + kerf
@@ -1299,10 +1452,11 @@ def _arrange_parts_linear_vertical(board: Board, parts: List[Part], kerf: float)
 def _arrange_parts_corner_compact(board: Board, parts: List[Part], kerf: float) -> bool:
     """Pack parts tightly in one corner using shelf algorithm."""
     # Sort parts by area (largest first)
-    sorted_parts = sorted(parts, key=lambda p: p.requested_length * p.requested_width, reverse=True)
+    sorted_parts = sorted(parts, key=attrgetter('area'), reverse=True)
     
     # Use simple shelf packing starting from (0,0)
     shelves = []  # List of (y_pos, x_end, height)
+    total_shelf_height = 0.0  # Stacked height of all shelves so far, kerf included
     
     for part in sorted_parts:
         part_length = part.requested_length
@@ -1314,10 +1468,7 @@ def _arrange_parts_corner_compact(board: Board, parts: List[Part], kerf: float)
             if (shelf_x_end + part_length <= board.total_length and
                 shelf_y + part_width <= board.total_width):
                 # Place on this shelf
-                part.x_pos = shelf_x_end
-                part.y_pos = shelf_y
-                setattr(part, 'x', shelf_x_end)
-                setattr(part, 'y', shelf_y)
+                _record_placement(part, shelf_x_end, shelf_y, part_length, part_width)
                 
                 board.parts_on_board.append(part)
                 # Update shelf
@@ -1327,16 +1478,13 @@ def _arrange_parts_corner_compact(board: Board, parts: List[Part], kerf: float)
         
         if not placed:
             # Create new shelf
-            new_shelf_y = sum(s[2] + kerf for s in shelves) if shelves else 0.0
-            if (new_shelf_y + part_width <= board.total_width and
+            if (total_shelf_height + part_width <= board.total_width and
                 part_length <= board.total_length):
-                part.x_pos = 0.0
-                part.y_pos = new_shelf_y
-                setattr(part, 'x', 0.0)
-                setattr(part, 'y', new_shelf_y)
+                _record_placement(part, 0.0, total_shelf_height, part_length, part_width)
                 
                 board.parts_on_board.append(part)
-                shelves.append((new_shelf_y, part_length + kerf, part_width))
+                shelves.append((total_shelf_height, part_length + kerf, part_width))
+                total_shelf_height += part_width + kerf
             else:
                 # Part doesn't fit - arrangement failed
                 return False
@@ -1349,72 +1497,68 @@ def _arrange_parts_L_shaped(board: Board, parts: List[Part], kerf: float) -> boo
         return True
     
     # Sort parts by area (largest first)
-    sorted_parts = sorted(parts, key=lambda p: p.requested_length * p.requested_width, reverse=True)
+    sorted_parts = sorted(parts, key=attrgetter('area'), reverse=True)
     
     # Try to create L-shape: first fill bottom edge, then left edge
     bottom_x, left_y = 0.0, 0.0
     bottom_height, left_width = 0.0, 0.0
     
-    # Place parts along bottom edge first
-    for i, part in enumerate(sorted_parts[:]):
+    # Place parts along bottom edge first; next_index is the first part not yet placed
+    next_index = 0
+    while next_index < len(sorted_parts):
+        part = sorted_parts[next_index]
         part_length = part.requested_length
         part_width = part.requested_width
         
         # Try bottom edge placement
-        if bottom_x + part_length <= board.total_length:
-            part.x_pos = bottom_x
-            part.y_pos = 0.0
-            setattr(part, 'x', bottom_x)
-            setattr(part, 'y', 0.0)
-            
-            board.parts_on_board.append(part)
-            bottom_x += part_length + kerf
-            bottom_height = max(bottom_height, part_width)
-            sorted_parts.remove(part)
-        else:
+        if bottom_x + part_length > board.total_length:
             break
+        _record_placement(part, bottom_x, 0.0, part_length, part_width)
+        
+        board.parts_on_board.append(part)
+        bottom_x += part_length + kerf
+        bottom_height = max(bottom_height, part_width)
+        next_index += 1
     
     # Place remaining parts along left edge
     left_y = bottom_height + kerf
-    for part in sorted_parts[:]:
+    while next_index < len(sorted_parts):
+        part = sorted_parts[next_index]
         part_length = part.requested_length
         part_width = part.requested_width
         
         # Try left edge placement
-        if left_y + part_width <= board.total_width:
-            part.x_pos = 0.0
-            part.y_pos = left_y
-            setattr(part, 'x', 0.0)
-            setattr(part, 'y', left_y)
-            
-            board.parts_on_board.append(part)
-            left_y += part_width + kerf
-            left_width = max(left_width, part_length)
-            sorted_parts.remove(part)
-        else:
+        if left_y + part_width > board.total_width:
             break
-    
-    # If there are still parts left, try to place them in remaining space
-    if sorted_parts:
-        # Use simple shelf packing for remaining parts
-        remaining_x = max(bottom_x, left_width + kerf)
-        remaining_y = bottom_height + kerf
+        _record_placement(part, 0.0, left_y, part_length, part_width)
         
-        for part in sorted_parts:
-            if (remaining_x + part.requested_length <= board.total_length and
-                remaining_y + part.requested_width <= board.total_width):
-                part.x_pos = remaining_x
-                part.y_pos = remaining_y
-                setattr(part, 'x', remaining_x)
-                setattr(part, 'y', remaining_y)
-                
-                board.parts_on_board.append(part)
-                remaining_y += part.requested_width + kerf
-            else:
-                # Part doesn't fit - arrangement failed
-                return False
+        board.parts_on_board.append(part)
+        left_y += part_width + kerf
+        left_width = max(left_width, part_length)
+        next_index += 1
+    
+    # If there are still parts left, use simple shelf packing for them in the remaining space
+    remaining_x = max(bottom_x, left_width + kerf)
+    remaining_y = bottom_height + kerf
+    tail_parts = sorted_parts[next_index:]
+    if not tail_parts:
+        return True
     
-    return True
+    # The tail stacks in one column, so every y is a running sum of the widths above it (summed in
+    # placement order, as the stacking would), and the fit of every part is checked in one pass
+    tail_lengths = np.array([part.requested_length for part in tail_parts], dtype=float)
+    tail_widths = np.array([part.requested_width for part in tail_parts], dtype=float)
+    tail_ys = np.cumsum(np.concatenate(([remaining_y], tail_widths[:-1] + kerf)))
+    fits = (remaining_x + tail_lengths <= board.total_length) & (tail_ys + tail_widths <= board.total_width)
+    
+    # Parts before the first that doesn't fit are still placed, as the arrangement stops there
+    fit_count = len(tail_parts) if fits.all() else int(np.argmin(fits))
+    for part, y in zip(tail_parts[:fit_count], tail_ys[:fit_count].tolist()):
+        _record_placement(part, remaining_x, y, part.requested_length, part.requested_width)
+        board.parts_on_board.append(part)
+    
+    # Arrangement failed if any part doesn't fit
+    return fit_count == len(tail_parts)
 
 # Additional utility functions for integration
 def get_max_utilisation_algorithm_info() -> Dict[str, object]:
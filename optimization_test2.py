@@ -4,14 +4,19 @@ Implementation of best-fit layout with minimal waste using repacking of low-util
 """
 
 import logging
+import numpy as np
+from bisect import bisect_left
+from collections import defaultdict
+from operator import attrgetter
 from typing import List, Dict, Tuple, Optional
-from copy import deepcopy
 from data_models import Part, Board, MaterialDetails
 
 logger = logging.getLogger(__name__)
 
 class Test2Part:
     """Internal part representation for the TEST 2 algorithm."""
+    __slots__ = ('id', 'length', 'width', 'area', 'grain_sensitive', 'original_part', 'placed', 'rotation')
+
     def __init__(self, part_id: str, length: float, width: float, grain_sensitive: bool = True, original_part: Optional[Part] = None):
         self.id = part_id
         self.length = length
@@ -28,52 +33,62 @@ class Test2Part:
 
 class Test2Board:
     """Internal board representation with tight nesting and repacking capabilities."""
+    __slots__ = ('id', 'length', 'width', 'parts', 'used_area', 'offcuts', '_offcut_keys', '_offcuts_created')
+
     def __init__(self, board_id: str, length: float, width: float):
+        self._reset(board_id, length, width)
+
+    @classmethod
+    def acquire(cls, pool: List['Test2Board'], board_id: str, length: float, width: float) -> 'Test2Board':
+        """Get an empty board, reusing one released to the caller's pool when available."""
+        board = pool.pop() if pool else cls.__new__(cls)
+        board._reset(board_id, length, width)
+        return board
+
+    def release(self, pool: List['Test2Board']):
+        """Return a discarded board to the caller's pool; it must not be used afterwards."""
+        self.parts = []  # Don't keep the parts alive from the pool
+        pool.append(self)
+
+    def _reset(self, board_id: str, length: float, width: float):
         self.id = board_id
         self.length = length
         self.width = width
         self.parts = []  # (Test2Part, x, y, rotated)
-        self.offcuts = [(0, 0, length, width)]  # (x, y, length, width)
+        self.used_area = 0.0  # Running sum of placed part areas
+        self.offcuts = [(0, 0, length, width)]  # (x, y, length, width), ordered by _offcut_keys
+        self._offcut_keys = [(length * width, 0)]  # (area, creation order), ascending
+        self._offcuts_created = 1
     
     def utilization(self):
-        if not self.parts:
-            return 0.0
-        used_area = sum(p.area for p, _, _, _ in self.parts)
-        return used_area / (self.length * self.width)
+        return self.used_area / (self.length * self.width) if self.parts else 0.0
 
     def best_fit_position(self, part: Test2Part, kerf: float = 4.4) -> Tuple[Optional[int], Optional[bool]]:
         """Find best-fit position for a part considering kerf spacing."""
-        best_index = None
-        best_score = float('inf')
-        best_rotated = False
-
-        for i, (x, y, l, w) in enumerate(self.offcuts):
-            # Try normal orientation
-            part_length_with_kerf = part.length + kerf
-            part_width_with_kerf = part.width + kerf
-            
+        # Part size with kerf is the same for every offcut, so the fit checks only compare against l and w
+        part_length_with_kerf = part.length + kerf
+        part_width_with_kerf = part.width + kerf
+        part_area_with_kerf = part_length_with_kerf * part_width_with_kerf
+        can_rotate = not part.grain_sensitive
+
+        # Offcuts are kept in ascending area order (oldest first on ties), so the first one the part
+        # fits in has the smallest leftover area; smaller offcuts than the part can't fit it at all
+        for i in range(bisect_left(self._offcut_keys, (part_area_with_kerf,)), len(self.offcuts)):
+            _, _, l, w = self.offcuts[i]
+            # Try normal orientation, then rotated orientation (if part can rotate)
             if part_length_with_kerf <= l and part_width_with_kerf <= w:
-                score = (l * w) - (part_length_with_kerf * part_width_with_kerf)
-                if score < best_score:
-                    best_index = i
-                    best_score = score
-                    best_rotated = False
-            
-            # Try rotated orientation (if part can rotate)
-            elif not part.grain_sensitive and part_width_with_kerf <= l and part_length_with_kerf <= w:
-                score = (l * w) - (part_length_with_kerf * part_width_with_kerf)
-                if score < best_score:
-                    best_index = i
-                    best_score = score
-                    best_rotated = True
+                return i, False
+            if can_rotate and part_width_with_kerf <= l and part_length_with_kerf <= w:
+                return i, True
 
-        return best_index, best_rotated
+        return None, False
 
     def place_part(self, part: Test2Part, kerf: float = 4.4) -> bool:
         """Place part using best-fit strategy."""
         idx, rot = self.best_fit_position(part, kerf)
         if idx is not None:
             x, y, l, w = self.offcuts.pop(idx)
+            del self._offcut_keys[idx]
             if rot:
                 pl, pw = part.width + kerf, part.length + kerf
                 self.parts.append((part, x, y, True))
@@ -84,6 +99,7 @@ class Test2Board:
                 part.rotation = False
             
             self._generate_offcuts(x, y, pl, pw, l, w)
+            self.used_area += part.area
             part.placed = True
             return True
         return False
@@ -91,22 +107,99 @@ class Test2Board:
     def _generate_offcuts(self, x: float, y: float, pl: float, pw: float, l: float, w: float):
         """Generate guillotine-compatible 2-offcut logic."""
         if l > pl:
-            self.offcuts.append((x + pl, y, l - pl, pw))
+            self._add_offcut(x + pl, y, l - pl, pw)
         if w > pw:
-            self.offcuts.append((x, y + pw, l, w - pw))
+            self._add_offcut(x, y + pw, l, w - pw)
 
-    def repack_with(self, parts: List[Test2Part], kerf: float = 4.4) -> Optional['Test2Board']:
-        """Attempt to repack all parts plus new parts on board."""
-        new_board = Test2Board(self.id + '_repack', self.length, self.width)
-        all_parts = sorted(parts, key=lambda p: p.area, reverse=True)
+    def _add_offcut(self, x: float, y: float, l: float, w: float):
+        """Insert an offcut at its place in area order."""
+        key = (l * w, self._offcuts_created)
+        self._offcuts_created += 1
+        idx = bisect_left(self._offcut_keys, key)
+        self._offcut_keys.insert(idx, key)
+        self.offcuts.insert(idx, (x, y, l, w))
+
+    def fits_empty(self, part: Test2Part, kerf: float = 4.4) -> bool:
+        """Check whether the part with kerf fits an empty board of this size in any allowed orientation."""
+        part_length_with_kerf = part.length + kerf
+        part_width_with_kerf = part.width + kerf
+        if part_length_with_kerf <= self.length and part_width_with_kerf <= self.width:
+            return True
+        return (not part.grain_sensitive
+                and part_width_with_kerf <= self.length and part_length_with_kerf <= self.width)
+
+    def repack_with(self, parts: List[Test2Part], kerf: float = 4.4,
+                    board_pool: Optional[List['Test2Board']] = None) -> Optional['Test2Board']:
+        """
+        Attempt to repack all parts plus new parts on board. A failed attempt's board is released to
+        board_pool for the next attempt; each optimizer run passes its own pool, as it is not thread-safe.
+        """
+        if board_pool is None:
+            board_pool = []
+        
+        # Every part takes at least its kerf-padded area, and each must fit the bare board,
+        # so parts failing either check can never repack and the attempt is skipped
+        if sum((p.length + kerf) * (p.width + kerf) for p in parts) > self.length * self.width:
+            return None
+        if not all(self.fits_empty(p, kerf) for p in parts):
+            return None
         
+        new_board = Test2Board.acquire(board_pool, self.id + '_repack', self.length, self.width)
+        all_parts = sorted(parts, key=attrgetter('area'), reverse=True)
+        
+        # A failed attempt leaves the parts where they were, so their placement status is put back
+        placed_before = [part.placed for part in all_parts]
         for part in all_parts:
-            part.placed = False  # Reset placement status
             if not new_board.place_part(part, kerf):
+                for p, was_placed in zip(all_parts, placed_before):
+                    p.placed = was_placed
+                new_board.release(board_pool)
                 return None
         return new_board
 
 
+class Test2OffcutIndex:
+    """
+    Offcut lengths and widths of every board in a group, one padded row per board, so the first
+    board a part fits on is found in one vectorized pass instead of a best-fit scan per board.
+    """
+    def __init__(self):
+        self.lengths = np.full((16, 8), -np.inf)
+        self.widths = np.full((16, 8), -np.inf)
+        self.board_count = 0
+
+    def set_board(self, index: int, board: Test2Board):
+        """Record the current offcuts of the board at this position in the board list."""
+        rows, cols = self.lengths.shape
+        if index >= rows or len(board.offcuts) > cols:
+            grown_shape = (max(rows, 2 * (index + 1)), max(cols, 2 * len(board.offcuts)))
+            for name in ('lengths', 'widths'):
+                grown = np.full(grown_shape, -np.inf)
+                grown[:rows, :cols] = getattr(self, name)
+                setattr(self, name, grown)
+        
+        count = len(board.offcuts)
+        self.lengths[index] = -np.inf
+        self.widths[index] = -np.inf
+        self.lengths[index, :count] = [offcut[2] for offcut in board.offcuts]
+        self.widths[index, :count] = [offcut[3] for offcut in board.offcuts]
+        self.board_count = max(self.board_count, index + 1)
+
+    def first_fitting_board(self, part: Test2Part, kerf: float = 4.4) -> Optional[int]:
+        """Get the position of the first board with an offcut the part fits in with kerf, in any allowed orientation."""
+        lengths = self.lengths[:self.board_count]
+        widths = self.widths[:self.board_count]
+        part_length_with_kerf = part.length + kerf
+        part_width_with_kerf = part.width + kerf
+        
+        fits = (part_length_with_kerf <= lengths) & (part_width_with_kerf <= widths)
+        if not part.grain_sensitive:
+            fits |= (part_width_with_kerf <= lengths) & (part_length_with_kerf <= widths)
+        
+        fitting_boards = np.flatnonzero(fits.any(axis=1))
+        return int(fitting_boards[0]) if len(fitting_boards) else None
+
+
 class TightNestingOptimizer:
     """TEST 2 algorithm with tight nesting and low-utilization board repacking."""
     
@@ -117,6 +210,7 @@ class TightNestingOptimizer:
         self.kerf = kerf
         self.used_boards = []
         self.unplaced_parts = []
+        self._board_dimensions_cache = {}  # material string -> (length, width)
         
     def optimize(self) -> Tuple[List[Board], List[Part], Dict, float, float]:
         """Run the tight nesting TEST 2 optimization algorithm."""
@@ -129,10 +223,18 @@ class TightNestingOptimizer:
         for material_type, parts_group in material_groups.items():
             self._optimize_material_group_tight_nesting(material_type, parts_group)
         
-        # Calculate costs (simplified - no upgrades)
-        initial_cost = final_cost = sum(board.material_details.get_cost_per_sqm(
-            self.core_db, self.laminate_db
-        ) * (board.total_length * board.total_width / 1_000_000) for board in self.used_boards)
+        # Calculate costs (simplified - no upgrades), pricing each material once
+        cost_per_sqm = {}
+        for board in self.used_boards:
+            material_key = board.material_details.full_material_string
+            if material_key not in cost_per_sqm:
+                cost_per_sqm[material_key] = board.material_details.get_cost_per_sqm(self.core_db, self.laminate_db)
+        board_count = len(self.used_boards)
+        board_costs = np.fromiter((cost_per_sqm[board.material_details.full_material_string]
+                                   for board in self.used_boards), np.float64, board_count)
+        board_areas_sqm = np.fromiter((board.total_length * board.total_width / 1_000_000
+                                       for board in self.used_boards), np.float64, board_count)
+        initial_cost = final_cost = float(board_costs @ board_areas_sqm)
         
         logger.info(f"TEST 2 Tight Nesting Algorithm complete: {len(self.used_boards)} boards, {len(self.unplaced_parts)} unplaced")
         
@@ -140,20 +242,20 @@ class TightNestingOptimizer:
 
     def _group_parts_by_material(self) -> Dict[str, List[Part]]:
         """Group parts by their material specifications."""
-        material_groups = {}
+        material_groups = defaultdict(list)
         for part in self.parts_list:
-            material_key = part.material_details.full_material_string
-            if material_key not in material_groups:
-                material_groups[material_key] = []
-            material_groups[material_key].append(part)
+            material_groups[part.material_details.full_material_string].append(part)
         return material_groups
 
     def _get_board_dimensions(self, material_type: str) -> Tuple[float, float]:
         """Extract board dimensions from core database."""
-        try:
-            material_details = MaterialDetails(material_type)
+        if material_type in self._board_dimensions_cache:
+            return self._board_dimensions_cache[material_type]
+        
+        material_details = MaterialDetails.try_parse(material_type)
+        if material_details is not None:
             core_name = material_details.core_name
-        except:
+        else:
             logger.warning(f"Could not parse material type: {material_type}, using default HDHMR")
             core_name = "HDHMR"
         
@@ -165,6 +267,7 @@ class TightNestingOptimizer:
             length, width = 2420.0, 1220.0
             
         logger.info(f"Board dimensions for {core_name}: {length}x{width}mm")
+        self._board_dimensions_cache[material_type] = (length, width)
         return length, width
     
     def _optimize_material_group_tight_nesting(self, material_type: str, parts_group: List[Part]) -> None:
@@ -173,53 +276,81 @@ class TightNestingOptimizer:
         
         logger.info(f"Running tight nesting optimization for {len(parts_group)} parts of material {material_type}")
         
-        # Convert to Test2Part objects and sort by area (largest first)
+        # Part geometry as arrays, for the area sort and the bare-board fit check in one pass each
+        part_count = len(parts_group)
+        lengths = np.fromiter((part.requested_length for part in parts_group), np.float64, part_count)
+        widths = np.fromiter((part.requested_width for part in parts_group), np.float64, part_count)
+        grain_sensitive = np.fromiter((part.grains == 1 for part in parts_group), np.bool_, part_count)  # 1 = grain sensitive, 0 = can rotate
+        
+        # Sort parts by area (largest first, input order on ties) for tight nesting
+        order = np.argsort(-(lengths * widths), kind='stable')
+        fits_board = (((lengths + self.kerf <= board_length) & (widths + self.kerf <= board_width))
+                      | (~grain_sensitive & (widths + self.kerf <= board_length) & (lengths + self.kerf <= board_width)))
+        
+        # Convert to Test2Part objects in sorted order
         test_parts = []
-        for part in parts_group:
-            grain_sensitive = part.grains == 1  # 1 = grain sensitive, 0 = can rotate
+        for i in order.tolist():
+            part = parts_group[i]
             test_part = Test2Part(
                 part_id=part.id,
                 length=part.requested_length,
                 width=part.requested_width,
-                grain_sensitive=grain_sensitive,
+                grain_sensitive=bool(grain_sensitive[i]),
                 original_part=part
             )
             test_parts.append(test_part)
-        
-        # Sort parts by area (largest first) for tight nesting
-        test_parts.sort(key=lambda p: p.area, reverse=True)
+        fits_board = fits_board[order].tolist()
         
         board_dims = (board_length, board_width)
         boards = []
         board_count = 0
+        offcut_index = Test2OffcutIndex()  # Kept in step with every board's offcuts
+        repack_threshold_area = 0.65 * board_length * board_width
+        low_utilization_indices = []  # Positions of boards below the repack threshold, ascending
+        repack_board_pool = []  # Boards from failed repacks, reused within this material group only
+        log_placements = logger.isEnabledFor(logging.DEBUG)
+        log_boards = logger.isEnabledFor(logging.INFO)
         
-        for part in test_parts:
+        for part, fits_bare_board in zip(test_parts, fits_board):
             if part.placed:
                 continue
+            if not fits_bare_board:
+                logger.warning(f"Could not place {part.id} even on new board")
+                continue
                 
             placed = False
 
-            # Try placing in existing boards
-            for board in boards:
-                if board.place_part(part, self.kerf):
-                    placed = True
+            # Try placing in existing boards, on the first one with an offcut the part fits in
+            board_index = offcut_index.first_fitting_board(part, self.kerf)
+            if board_index is not None:
+                board = boards[board_index]
+                was_low_utilization = board.used_area < repack_threshold_area
+                placed = board.place_part(part, self.kerf)
+                offcut_index.set_board(board_index, board)
+                if was_low_utilization and board.used_area >= repack_threshold_area:
+                    low_utilization_indices.remove(board_index)
+                if log_placements:
                     logger.debug(f"Placed {part.id} on existing {board.id}")
-                    break
 
             # Try repacking low-utilization boards (threshold: 65%)
-            if not placed:
-                repack_targets = [b for b in boards if b.utilization() < 0.65]
-                for target_board in repack_targets:
+            if not placed and boards:
+                # No existing offcut fits the part (checked above), so only a full repack can place it
+                for target_index in low_utilization_indices:
+                    target_board = boards[target_index]
+                    # The part is unplaced, so it is never already among the board's parts
                     current_parts = [p for p, _, _, _ in target_board.parts]
-                    if part not in current_parts:
-                        current_parts.append(part)
+                    current_parts.append(part)
                     
-                    new_board = target_board.repack_with(current_parts, self.kerf)
+                    new_board = target_board.repack_with(current_parts, self.kerf, repack_board_pool)
                     if new_board:
-                        boards[boards.index(target_board)] = new_board
+                        boards[target_index] = new_board
+                        offcut_index.set_board(target_index, new_board)
+                        if new_board.used_area >= repack_threshold_area:
+                            low_utilization_indices.remove(target_index)
                         part.placed = True
                         placed = True
-                        logger.info(f"Repacked {target_board.id} to fit {part.id}")
+                        if log_boards:
+                            logger.info(f"Repacked {target_board.id} to fit {part.id}")
                         break
 
             # Open new board if all fails
@@ -228,7 +359,11 @@ class TightNestingOptimizer:
                 new_board = Test2Board(f"TightNest-Board-{board_count}", board_dims[0], board_dims[1])
                 if new_board.place_part(part, self.kerf):
                     boards.append(new_board)
-                    logger.info(f"Created new board {new_board.id} for {part.id}")
+                    offcut_index.set_board(len(boards) - 1, new_board)
+                    if new_board.used_area < repack_threshold_area:
+                        low_utilization_indices.append(len(boards) - 1)
+                    if log_boards:
+                        logger.info(f"Created new board {new_board.id} for {part.id}")
                 else:
                     logger.warning(f"Could not place {part.id} even on new board")
         
@@ -242,12 +377,10 @@ class TightNestingOptimizer:
                                         material_type: str, strategy_name: str) -> None:
         """Convert Test2Board objects back to OptiWise Board objects."""
         
+        material_details = MaterialDetails.try_parse(material_type) or MaterialDetails("Unknown_Unknown_Unknown")
+        
+        log_boards = logger.isEnabledFor(logging.INFO)
         for i, test_board in enumerate(test_boards, 1):
-            try:
-                material_details = MaterialDetails(material_type)
-            except:
-                material_details = MaterialDetails("Unknown_Unknown_Unknown")
-            
             # Create OptiWise board
             board = Board(
                 board_id=f"{material_type}_{strategy_name}_Board_{i}",
@@ -260,23 +393,17 @@ class TightNestingOptimizer:
             # Add placed parts to the board
             for test_part, x, y, rotated in test_board.parts:
                 original_part = test_part.original_part
-                original_part.x_pos = x
-                original_part.y_pos = y
-                original_part.rotated = rotated
-                
+                original_part.x_pos, original_part.y_pos, original_part.rotated = x, y, rotated
                 if rotated:
-                    original_part.actual_length = test_part.width
-                    original_part.actual_width = test_part.length
+                    original_part.actual_length, original_part.actual_width = test_part.width, test_part.length
                 else:
-                    original_part.actual_length = test_part.length
-                    original_part.actual_width = test_part.width
-                
-                board.parts_on_board.append(original_part)
+                    original_part.actual_length, original_part.actual_width = test_part.length, test_part.width
+            board.parts_on_board.extend(test_part.original_part for test_part, _, _, _ in test_board.parts)
             
             self.used_boards.append(board)
             
-            utilization_percent = test_board.utilization() * 100
-            logger.info(f"Board {board.id}: {len(board.parts_on_board)} parts, {utilization_percent:.1f}% utilization")
+            if log_boards:
+                logger.info(f"Board {board.id}: {len(board.parts_on_board)} parts, {test_board.utilization() * 100:.1f}% utilization")
         
         # Add unplaced parts
         for unplaced_test_part in unplaced_test_parts:
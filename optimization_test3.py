@@ -4,14 +4,23 @@ Implementation of the provided advanced optimizer with global offcut sharing and
 """
 
 import logging
+import multiprocessing
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 from typing import List, Dict, Tuple, Optional
 from copy import deepcopy
 from data_models import Part, Board, MaterialDetails
 
 logger = logging.getLogger(__name__)
 
+PARALLEL_MIN_PARTS = 1000  # Spread material groups over worker processes only for jobs at least this large
+
 class Test3Part:
     """Internal part representation for the TEST 3 algorithm."""
+    __slots__ = ('id', 'length', 'width', 'area', 'placed', 'grain_sensitive', 'original_part')
+
     def __init__(self, part_id: str, length: float, width: float, grain_sensitive: bool = True, original_part: Optional[Part] = None):
         self.id = part_id
         self.length = length
@@ -27,18 +36,36 @@ class Test3Part:
 
 class Test3Board:
     """Internal board representation with global offcut management."""
+    __slots__ = ('id', 'length', 'width', 'parts', 'offcuts', '_part_rects', '_part_count', '_used_area')
+
     def __init__(self, board_id: str, length: float, width: float):
         self.id = board_id
         self.length = length
         self.width = width
+        self.clear()
+
+    def clear(self):
+        """Empty the board of parts, leaving one full-board offcut."""
         self.parts = []  # (Test3Part, x, y, rotated)
-        self.offcuts = [(0, 0, length, width)]
+        self.offcuts = [(0, 0, self.length, self.width)]
+        # Placed rectangles (x, y, placed length, placed width) of the first _part_count parts, for vectorized free-area checks
+        self._part_rects = np.empty((8, 4))
+        self._part_count = 0
+        self._used_area = 0.0  # Running sum of placed part areas
+
+    def snapshot(self) -> Tuple:
+        """Capture the board's placements so restore can undo a later clear and refill."""
+        # clear() rebinds fresh containers, so holding the current ones is enough
+        return self.parts, self.offcuts, self._part_rects, self._part_count, self._used_area
+
+    def restore(self, snapshot: Tuple):
+        """Put back the placements captured by snapshot."""
+        self.parts, self.offcuts, self._part_rects, self._part_count, self._used_area = snapshot
 
     def utilization(self):
         if not self.parts:
             return 0.0
-        used_area = sum(p.area for p, _, _, _ in self.parts)
-        return (used_area / (self.length * self.width)) * 100
+        return (self._used_area / (self.length * self.width)) * 100
 
     def place_part(self, part: Test3Part, kerf: float = 4.4) -> bool:
         """Place part using best-fit strategy with global offcut management."""
@@ -46,25 +73,36 @@ class Test3Board:
         best_score = float('inf')
         best_rotated = False
         
-        for i, (x, y, l, w) in enumerate(self.offcuts):
-            # Try normal orientation
-            if part.length + kerf <= l and part.width + kerf <= w:
-                score = (l * w) - part.area
-                if score < best_score:
-                    best_index, best_score, best_rotated = i, score, False
+        # Part size with kerf is the same for every offcut, so the fit checks only compare against l and w
+        part_length_with_kerf = part.length + kerf
+        part_width_with_kerf = part.width + kerf
+        part_area = part.area
+        can_rotate = not part.grain_sensitive
+        
+        # A fitting offcut is at least the kerf-padded part, so an offcut that tight can't be beaten
+        exact_fit_score = part_length_with_kerf * part_width_with_kerf - part_area
+        
+        for i, (_, _, l, w) in enumerate(self.offcuts):
+            # Try normal orientation, then rotated orientation (if part can rotate)
+            if part_length_with_kerf <= l and part_width_with_kerf <= w:
+                rotated = False
+            elif can_rotate and part_width_with_kerf <= l and part_length_with_kerf <= w:
+                rotated = True
+            else:
+                continue
             
-            # Try rotated orientation (if part can rotate)
-            elif not part.grain_sensitive and part.width + kerf <= l and part.length + kerf <= w:
-                score = (l * w) - part.area
-                if score < best_score:
-                    best_index, best_score, best_rotated = i, score, True
+            score = l * w - part_area
+            if score < best_score:
+                best_index, best_score, best_rotated = i, score, rotated
+                if score <= exact_fit_score:
+                    break
 
         if best_index is not None:
             x, y, l, w = self.offcuts.pop(best_index)
             pl, pw = (part.width, part.length) if best_rotated else (part.length, part.width)
             pl += kerf
             pw += kerf
-            self.parts.append((part, x, y, best_rotated))
+            self._add_part(part, x, y, best_rotated)
             self._split_offcut((x, y, l, w), pl, pw)
             part.placed = True
             return True
@@ -80,42 +118,43 @@ class Test3Board:
         
         if margin_x >= 0:
             # Try vertical positions in steps to find free area
-            for y_pos in range(0, int(self.width - part.width - kerf + 1), step_size):
-                if self._is_area_free(margin_x, y_pos, part.length + kerf, part.width + kerf):
-                    self.parts.append((part, margin_x, y_pos, False))
-                    part.placed = True
-                    
-                    # CRITICAL FIX: Update offcuts to reflect the placed part
-                    # Remove any offcuts that overlap with the placed part area
-                    placed_area = (margin_x, y_pos, part.length + kerf, part.width + kerf)
-                    self._remove_overlapping_offcuts(placed_area)
-                    
-                    logger.debug(f"Edge-fit placed {part.id} at right edge ({margin_x}, {y_pos})")
-                    return True
+            y_pos = self._first_free_y(margin_x, int(self.width - part.width - kerf + 1), step_size,
+                                       part.length + kerf, part.width + kerf)
+            if y_pos is not None:
+                self._add_part(part, margin_x, y_pos, False)
+                part.placed = True
+                
+                # CRITICAL FIX: Update offcuts to reflect the placed part
+                # Cut the placed part area out of any offcuts it overlaps
+                placed_area = (margin_x, y_pos, part.length + kerf, part.width + kerf)
+                self._split_overlapping_offcuts(placed_area)
+                
+                logger.debug(f"Edge-fit placed {part.id} at right edge ({margin_x}, {y_pos})")
+                return True
         
         # Try rotated placement if part can rotate
         if not part.grain_sensitive:
             margin_x_rot = self.length - part.width - kerf
             if margin_x_rot >= 0:
-                for y_pos in range(0, int(self.width - part.length - kerf + 1), step_size):
-                    if self._is_area_free(margin_x_rot, y_pos, part.width + kerf, part.length + kerf):
-                        self.parts.append((part, margin_x_rot, y_pos, True))
-                        part.placed = True
-                        
-                        # CRITICAL FIX: Update offcuts for rotated placement
-                        placed_area = (margin_x_rot, y_pos, part.width + kerf, part.length + kerf)
-                        self._remove_overlapping_offcuts(placed_area)
-                        
-                        logger.debug(f"Edge-fit placed {part.id} rotated at right edge ({margin_x_rot}, {y_pos})")
-                        return True
+                y_pos = self._first_free_y(margin_x_rot, int(self.width - part.length - kerf + 1), step_size,
+                                           part.width + kerf, part.length + kerf)
+                if y_pos is not None:
+                    self._add_part(part, margin_x_rot, y_pos, True)
+                    part.placed = True
+                    
+                    # CRITICAL FIX: Update offcuts for rotated placement
+                    placed_area = (margin_x_rot, y_pos, part.width + kerf, part.length + kerf)
+                    self._split_overlapping_offcuts(placed_area)
+                    
+                    logger.debug(f"Edge-fit placed {part.id} rotated at right edge ({margin_x_rot}, {y_pos})")
+                    return True
         
         return False
 
-    def _remove_overlapping_offcuts(self, placed_area):
-        """Remove offcuts that overlap with the placed part area."""
+    def _split_overlapping_offcuts(self, placed_area):
+        """Replace offcuts that overlap the placed part area with the pieces of them left free around it."""
         px, py, pl, pw = placed_area
         
-        # Filter out offcuts that overlap with the placed area
         new_offcuts = []
         for ox, oy, ol, ow in self.offcuts:
             # Check if offcut overlaps with placed area
@@ -125,28 +164,63 @@ class Test3Board:
             if not (x_overlap and y_overlap):
                 # No overlap, keep this offcut
                 new_offcuts.append((ox, oy, ol, ow))
-            # If there's overlap, we could split the offcut, but for now just remove it
-            # This is safer and prevents further overlapping issues
+                continue
+            
+            # Cut the offcut into full-height strips left and right of the placed area and the pieces
+            # below and above it between those strips. The pieces don't overlap each other, so offcuts
+            # stay disjoint and place_part can still use any of them without checking the rest
+            middle_x = max(ox, px)
+            middle_length = min(ox + ol, px + pl) - middle_x
+            pieces = (
+                (ox, oy, px - ox, ow),                                    # Left
+                (px + pl, oy, ox + ol - (px + pl), ow),                   # Right
+                (middle_x, oy, middle_length, py - oy),                   # Below
+                (middle_x, py + pw, middle_length, oy + ow - (py + pw)),  # Above
+            )
+            # Same minimum usable size as _split_offcut
+            new_offcuts.extend(piece for piece in pieces if piece[2] > 10 and piece[3] > 10)
         
         self.offcuts = new_offcuts
 
+    def _add_part(self, part: Test3Part, x: float, y: float, rotated: bool):
+        """Record a placed part and its placed rectangle."""
+        self.parts.append((part, x, y, rotated))
+        self._used_area += part.area
+        if self._part_count == len(self._part_rects):
+            self._part_rects = np.concatenate((self._part_rects, np.empty_like(self._part_rects)))
+        part_length, part_width = (part.width, part.length) if rotated else (part.length, part.width)
+        self._part_rects[self._part_count] = (x, y, part_length, part_width)
+        self._part_count += 1
+
+    def _blocking_parts(self, x: float, l: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the y and placed width of every part overlapping the strip from x to x + l in X."""
+        px, py, part_length, part_width = self._part_rects[:self._part_count].T
+        x_overlap = ~((x + l <= px) | (px + part_length <= x))
+        return py[x_overlap], part_width[x_overlap]
+
     def _is_area_free(self, x: float, y: float, l: float, w: float) -> bool:
         """Check if the specified area is free from existing parts."""
-        for part, px, py, rotated in self.parts:
-            # Get actual part dimensions considering rotation
-            if rotated:
-                part_length, part_width = part.width, part.length
-            else:
-                part_length, part_width = part.length, part.width
-            
-            # Check for overlap using rectangle intersection logic
-            # Two rectangles overlap if they intersect in both X and Y dimensions
-            x_overlap = not (x + l <= px or px + part_length <= x)
-            y_overlap = not (y + w <= py or py + part_width <= y)
-            
-            if x_overlap and y_overlap:
-                return False  # Area is occupied
-        return True  # Area is free
+        # Two rectangles overlap if they intersect in both X and Y dimensions
+        py, part_width = self._blocking_parts(x, l)
+        return not (~((y + w <= py) | (py + part_width <= y))).any()
+
+    def _first_free_y(self, x: float, y_stop: int, step: int, l: float, w: float) -> Optional[int]:
+        """Get the first y in range(0, y_stop, step) where the area at x is free from existing parts, or None."""
+        py, part_width = self._blocking_parts(x, l)
+        
+        # Sweep the parts blocking the strip in order of their y, jumping the candidate y to the first
+        # step at or past the top of each part it overlaps, until a part starts above the candidate area
+        y_index = 0
+        for part_y, part_end in sorted(zip(py.tolist(), (py + part_width).tolist())):
+            if part_y >= y_index * step + w:
+                break
+            if part_end > y_index * step:
+                y_index = int(part_end // step)
+                if y_index * step < part_end:
+                    y_index += 1
+        
+        y = y_index * step
+        return y if y < y_stop else None
 
     def _split_offcut(self, rect: Tuple[float, float, float, float], pl: float, pw: float):
         """Split offcut rectangle into reusable pieces using proper guillotine cuts."""
@@ -164,6 +238,54 @@ class Test3Board:
         return f"Test3Board({self.id}, {self.length}x{self.width})"
 
 
+class Test3OffcutIndex:
+    """
+    Offcut lengths and widths of every board in a group, one padded row per board, so the first
+    board with an offcut a part fits is found in one vectorized pass instead of a best-fit scan per board.
+    """
+    def __init__(self):
+        self.lengths = np.full((16, 8), -np.inf)
+        self.widths = np.full((16, 8), -np.inf)
+        self.board_count = 0
+
+    def set_board(self, index: int, board: Test3Board):
+        """Record the current offcuts of the board at this position in the board list."""
+        rows, cols = self.lengths.shape
+        if index >= rows or len(board.offcuts) > cols:
+            grown_shape = (max(rows, 2 * (index + 1)), max(cols, 2 * len(board.offcuts)))
+            for name in ('lengths', 'widths'):
+                grown = np.full(grown_shape, -np.inf)
+                grown[:rows, :cols] = getattr(self, name)
+                setattr(self, name, grown)
+        
+        count = len(board.offcuts)
+        self.lengths[index] = -np.inf
+        self.widths[index] = -np.inf
+        self.lengths[index, :count] = [offcut[2] for offcut in board.offcuts]
+        self.widths[index, :count] = [offcut[3] for offcut in board.offcuts]
+        self.board_count = max(self.board_count, index + 1)
+
+    def remove_board(self, index: int):
+        """Drop the board at this position, shifting later boards down as list.remove does."""
+        self.lengths[index:self.board_count - 1] = self.lengths[index + 1:self.board_count]
+        self.widths[index:self.board_count - 1] = self.widths[index + 1:self.board_count]
+        self.board_count -= 1
+
+    def first_fitting_board(self, part: Test3Part, kerf: float = 4.4) -> Optional[int]:
+        """Get the position of the first board with an offcut the part fits in with kerf, in any allowed orientation."""
+        lengths = self.lengths[:self.board_count]
+        widths = self.widths[:self.board_count]
+        part_length_with_kerf = part.length + kerf
+        part_width_with_kerf = part.width + kerf
+        
+        fits = (part_length_with_kerf <= lengths) & (part_width_with_kerf <= widths)
+        if not part.grain_sensitive:
+            fits |= (part_width_with_kerf <= lengths) & (part_length_with_kerf <= widths)
+        
+        fitting_boards = np.flatnonzero(fits.any(axis=1))
+        return int(fitting_boards[0]) if len(fitting_boards) else None
+
+
 class GlobalOptimizer:
     """Advanced optimizer with global offcut reuse and 2-pass packing."""
     def __init__(self, parts_list: List[Part], core_db: Dict, laminate_db: Dict, kerf: float = 4.4):
@@ -181,9 +303,10 @@ class GlobalOptimizer:
         # Group parts by material
         material_groups = self._group_parts_by_material()
         
-        # Process each material group with advanced global optimization
-        for material_type, parts_group in material_groups.items():
-            self._optimize_material_group_global(material_type, parts_group)
+        # Process each material group with advanced global optimization, then convert in group order
+        boards_by_material = self._optimize_material_groups(material_groups)
+        for material_type in material_groups:
+            self._convert_test3_boards_to_optiwise(boards_by_material[material_type], material_type, "GlobalOpt")
         
         # Calculate costs (simplified - no upgrades)
         initial_cost = final_cost = sum(board.material_details.get_cost_per_sqm(
@@ -223,145 +346,32 @@ class GlobalOptimizer:
         logger.info(f"Board dimensions for {core_name}: {length}x{width}mm")
         return length, width
 
-    def _optimize_material_group_global(self, material_type: str, parts_group: List[Part]) -> None:
-        """Run advanced global optimization for a single material group."""
-        board_length, board_width = self._get_board_dimensions(material_type)
-        
-        logger.info(f"Running advanced global optimization for {len(parts_group)} parts of material {material_type}")
-        
-        # Convert to Test3Part objects and sort by area (largest first)
-        test_parts = []
-        for part in parts_group:
-            grain_sensitive = part.grains == 1  # 1 = grain sensitive, 0 = can rotate
-            test_part = Test3Part(
-                part_id=part.id,
-                length=part.requested_length,
-                width=part.requested_width,
-                grain_sensitive=grain_sensitive,
-                original_part=part
-            )
-            test_parts.append(test_part)
-
-        # Sort parts by area (largest first) for optimal packing
-        test_parts = sorted(test_parts, key=lambda p: p.area, reverse=True)
-        
-        boards = []
-        board_dim = (board_length, board_width)
-        
-        # Phase 1: Enhanced placement with Last-Fit Repacking
-        logger.info("Phase 1: Enhanced placement with Last-Fit Repacking for grain-sensitive parts")
-        for part in test_parts:
-            if part.placed:
-                continue
-                
-            placed = False
-            # Try to place on existing boards first
-            for board in boards:
-                if board.place_part(part, kerf=self.kerf):
-                    placed = True
-                    logger.debug(f"Placed {part.id} on existing {board.id}")
-                    break
-            
-            # If not placed, try tight edge-fit strategy for narrow strips
-            if not placed:
-                for board in boards:
-                    if board.try_edge_fit(part, kerf=self.kerf):
-                        placed = True
-                        logger.debug(f"Edge-fit placed {part.id} on {board.id}")
-                        break
-            
-            # If still not placed, attempt Last-Fit Repacking on low-utilization boards
-            if not placed:
-                low_util_boards = sorted([b for b in boards if b.utilization() < 65.0], 
-                                       key=lambda b: b.utilization())
-                
-                for target_board in low_util_boards:
-                    # Collect all parts from the target board plus the new part
-                    test_parts_for_repack = [p for p, *_ in target_board.parts] + [part]
-                    
-                    # Reset placement status for repacking
-                    for p in test_parts_for_repack:
-                        p.placed = False
-                    
-                    # Create a new board to test repacking
-                    repack_board = Test3Board(f"{target_board.id}-repacked", 
-                                            target_board.length, target_board.width)
-                    
-                    # Try to fit all parts (sorted by area for better packing)
-                    fit_success = True
-                    sorted_repack_parts = sorted(test_parts_for_repack, 
-                                               key=lambda x: x.area, reverse=True)
-                    
-                    for p in sorted_repack_parts:
-                        if not repack_board.place_part(p, kerf=self.kerf):
-                            fit_success = False
-                            break
-                    
-                    if fit_success:
-                        # Successful repack - replace the old board
-                        logger.info(f"Last-Fit Repacking successful: {target_board.id} -> {repack_board.id}")
-                        boards.remove(target_board)
-                        boards.append(repack_board)
-                        placed = True
-                        break
-                    else:
-                        # Reset placement status if repack failed
-                        for p in test_parts_for_repack:
-                            if p != part:  # Don't reset the new part
-                                p.placed = True
-            
-            # Create new board if all placement attempts failed
-            if not placed:
-                new_board = Test3Board(f"Global-Board-{len(boards)+1}", *board_dim)
-                if new_board.place_part(part, kerf=self.kerf):
-                    boards.append(new_board)
-                    logger.debug(f"Created new board {new_board.id} for {part.id}")
-                else:
-                    logger.warning(f"Could not place {part.id} even on new board")
-
-        # Phase 2: Final consolidation pass for remaining low-utilization boards
-        threshold = 65.0
-        final_to_repack = [b for b in boards if b.utilization() < threshold]
+    def _optimize_material_groups(self, material_groups: Dict[str, List[Part]]) -> Dict[str, List[Test3Board]]:
+        """
+        Optimize every material group. Groups are independent, so large jobs run them in worker
+        processes (largest first); their boards are then pointed back at the caller's parts.
+        """
+        board_dimensions = {material_type: self._get_board_dimensions(material_type) for material_type in material_groups}
+        workers = min(len(material_groups), os.cpu_count() or 1)
         
-        if final_to_repack:
-            logger.info(f"Phase 2: Final consolidation of {len(final_to_repack)} remaining low-utilization boards")
-            
-            # Collect parts from remaining low-utilization boards
-            spare_parts = []
-            for board in final_to_repack:
-                spare_parts.extend([p for p, *_ in board.parts])
-            
-            # Reset placement status
-            for part in spare_parts:
-                part.placed = False
-            
-            # Keep only high-utilization boards
-            boards = [b for b in boards if b.utilization() >= threshold]
-            
-            # Re-place the spare parts with enhanced placement strategy
-            for part in sorted(spare_parts, key=lambda p: p.area, reverse=True):
-                placed = False
-                
-                # Try existing high-utilization boards first
-                for board in boards:
-                    if board.place_part(part, kerf=self.kerf):
-                        placed = True
-                        break
-                
-                # Create new board if needed
-                if not placed:
-                    new_board = Test3Board(f"Global-Board-{len(boards)+1}", *board_dim)
-                    if new_board.place_part(part, kerf=self.kerf):
-                        boards.append(new_board)
-                    else:
-                        logger.warning(f"Failed to repack {part.id}")
+        if workers > 1 and len(self.parts_list) >= PARALLEL_MIN_PARTS:
+            logger.info(f"Optimizing {len(material_groups)} material groups in {workers} worker processes")
+            try:
+                # spawn rather than fork: the Streamlit host process is multi-threaded
+                with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+                    futures = {
+                        material_type: executor.submit(_optimize_material_group_global, material_type, parts_group,
+                                                       *board_dimensions[material_type], self.kerf)
+                        for material_type, parts_group in sorted(material_groups.items(), key=lambda item: -len(item[1]))
+                    }
+                    return {material_type: _adopt_original_parts(future.result(), material_groups[material_type])
+                            for material_type, future in futures.items()}
+            except Exception as e:
+                logger.warning(f"Parallel material group optimization failed, running serially: {e}")
         
-        # Log final optimization results
-        total_utilization = sum(b.utilization() for b in boards) / len(boards) if boards else 0
-        logger.info(f"Final optimization complete: {len(boards)} boards, average utilization: {total_utilization:.1f}%")
-
-        # Convert to OptiWise format
-        self._convert_test3_boards_to_optiwise(boards, material_type, "GlobalOpt")
+        return {material_type: _optimize_material_group_global(material_type, parts_group,
+                                                               *board_dimensions[material_type], self.kerf)
+                for material_type, parts_group in material_groups.items()}
 
     def _convert_test3_boards_to_optiwise(self, test_boards: List[Test3Board], 
                                         material_type: str, strategy_name: str) -> None:
@@ -405,6 +415,162 @@ class GlobalOptimizer:
             logger.info(f"Board {board.id}: {len(board.parts_on_board)} parts, {utilization_percent:.1f}% utilization")
 
 
+def _adopt_original_parts(boards: List[Test3Board], parts: List[Part]) -> List[Test3Board]:
+    """Point the worker's copies of the parts on these boards back at the caller's parts."""
+    originals = {part.id: part for part in parts}
+    for board in boards:
+        for test_part, _, _, _ in board.parts:
+            test_part.original_part = originals[test_part.id]
+    return boards
+
+
+def _optimize_material_group_global(material_type: str, parts_group: List[Part], board_length: float,
+                                    board_width: float, kerf: float) -> List[Test3Board]:
+    """Run advanced global optimization for a single material group, returning its boards."""
+    logger.info(f"Running advanced global optimization for {len(parts_group)} parts of material {material_type}")
+    
+    # Convert to Test3Part objects and sort by area (largest first)
+    test_parts = []
+    for part in parts_group:
+        grain_sensitive = part.grains == 1  # 1 = grain sensitive, 0 = can rotate
+        test_part = Test3Part(
+            part_id=part.id,
+            length=part.requested_length,
+            width=part.requested_width,
+            grain_sensitive=grain_sensitive,
+            original_part=part
+        )
+        test_parts.append(test_part)
+
+    # Sort parts by area (largest first) for optimal packing
+    test_parts = sorted(test_parts, key=lambda p: p.area, reverse=True)
+    
+    boards = []
+    board_dim = (board_length, board_width)
+    offcut_index = Test3OffcutIndex()  # Kept in step with every board's offcuts
+    
+    # Phase 1: Enhanced placement with Last-Fit Repacking
+    logger.info("Phase 1: Enhanced placement with Last-Fit Repacking for grain-sensitive parts")
+    for part in test_parts:
+        if part.placed:
+            continue
+            
+        placed = False
+        # Try to place on existing boards first, on the first one with an offcut the part fits in
+        board_index = offcut_index.first_fitting_board(part, kerf)
+        if board_index is not None:
+            board = boards[board_index]
+            placed = board.place_part(part, kerf=kerf)
+            offcut_index.set_board(board_index, board)
+            logger.debug(f"Placed {part.id} on existing {board.id}")
+        
+        # If not placed, try tight edge-fit strategy for narrow strips
+        if not placed:
+            for board_index, board in enumerate(boards):
+                if board.try_edge_fit(part, kerf=kerf):
+                    offcut_index.set_board(board_index, board)
+                    placed = True
+                    logger.debug(f"Edge-fit placed {part.id} on {board.id}")
+                    break
+        
+        # If still not placed, attempt Last-Fit Repacking on low-utilization boards
+        if not placed:
+            board_utilizations = [(b.utilization(), b) for b in boards]
+            low_util_boards = [b for _, b in sorted((entry for entry in board_utilizations if entry[0] < 65.0),
+                                                    key=itemgetter(0))]
+            
+            for target_board in low_util_boards:
+                # Collect all parts from the target board plus the new part
+                test_parts_for_repack = [p for p, *_ in target_board.parts] + [part]
+                
+                # Reset placement status for repacking
+                for p in test_parts_for_repack:
+                    p.placed = False
+                
+                # Repack the target board in place, keeping its current layout to roll back to
+                layout_before_repack = target_board.snapshot()
+                target_board.clear()
+                
+                # Try to fit all parts, largest area first for better packing. Phase 1 places parts in
+                # that order and repacks keep it, so the board's parts plus the new one are already sorted
+                fit_success = True
+                for p in test_parts_for_repack:
+                    if not target_board.place_part(p, kerf=kerf):
+                        fit_success = False
+                        break
+                
+                if fit_success:
+                    # Successful repack - the repacked board moves to the end of the list
+                    repacked_id = f"{target_board.id}-repacked"
+                    logger.info(f"Last-Fit Repacking successful: {target_board.id} -> {repacked_id}")
+                    target_board.id = repacked_id
+                    target_index = boards.index(target_board)
+                    boards.pop(target_index)
+                    offcut_index.remove_board(target_index)
+                    boards.append(target_board)
+                    offcut_index.set_board(len(boards) - 1, target_board)
+                    placed = True
+                    break
+                else:
+                    # Restore the layout and placement status if repack failed
+                    target_board.restore(layout_before_repack)
+                    for p in test_parts_for_repack:
+                        if p != part:  # Don't reset the new part
+                            p.placed = True
+        
+        # Create new board if all placement attempts failed
+        if not placed:
+            new_board = Test3Board(f"Global-Board-{len(boards)+1}", *board_dim)
+            if new_board.place_part(part, kerf=kerf):
+                boards.append(new_board)
+                offcut_index.set_board(len(boards) - 1, new_board)
+                logger.debug(f"Created new board {new_board.id} for {part.id}")
+            else:
+                logger.warning(f"Could not place {part.id} even on new board")
+
+    # Phase 2: Final consolidation pass for remaining low-utilization boards
+    threshold = 65.0
+    final_to_repack = [b for b in boards if b.utilization() < threshold]
+    
+    if final_to_repack:
+        logger.info(f"Phase 2: Final consolidation of {len(final_to_repack)} remaining low-utilization boards")
+        
+        # Collect parts from remaining low-utilization boards
+        spare_parts = []
+        for board in final_to_repack:
+            spare_parts.extend([p for p, *_ in board.parts])
+        
+        # Reset placement status
+        for part in spare_parts:
+            part.placed = False
+        
+        # Keep only high-utilization boards
+        boards = [b for b in boards if b.utilization() >= threshold]
+        
+        # Re-place the spare parts with enhanced placement strategy
+        for part in sorted(spare_parts, key=lambda p: p.area, reverse=True):
+            placed = False
+            
+            # Try existing high-utilization boards first
+            for board in boards:
+                if board.place_part(part, kerf=kerf):
+                    placed = True
+                    break
+            
+            # Create new board if needed
+            if not placed:
+                new_board = Test3Board(f"Global-Board-{len(boards)+1}", *board_dim)
+                if new_board.place_part(part, kerf=kerf):
+                    boards.append(new_board)
+                else:
+                    logger.warning(f"Failed to repack {part.id}")
+    
+    # Log final optimization results
+    total_utilization = sum(b.utilization() for b in boards) / len(boards) if boards else 0
+    logger.info(f"Final optimization complete: {len(boards)} boards, average utilization: {total_utilization:.1f}%")
+    return boards
+
+
 def run_test3_optimization(parts_list: List[Part], core_db: Dict, laminate_db: Dict, kerf: float = 4.4) -> Tuple[List[Board], List[Part], Dict, float, float]:
     """Run the advanced global TEST 3 optimization algorithm."""
     optimizer = GlobalOptimizer(parts_list, core_db, laminate_db, kerf)
@@ -0,0 +1,18 @@
+"""
+Tests for the OptiWise data models.
+"""
+
+from data_models import Board, MaterialDetails, Part
+
+
+def test_slotted_board_place_and_unplace_part():
+    material = MaterialDetails('2614 SF_18MR_2614 SF')
+    board = Board('B1', material, 2440.0, 1220.0, 4.4)
+    part = Part('P1', 600.0, 400.0, 1, material, 0, 0)
+
+    assert board.place_part(part, board.available_rectangles[0], False, 0.0, 0.0, {})
+    assert part in board.parts_on_board
+
+    assert board.unplace_part(part)
+    assert part not in board.parts_on_board
+    assert board.utilization_percentage == board.get_utilization_percentage() == 0.0
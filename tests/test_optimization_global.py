@@ -0,0 +1,34 @@
+"""
+Tests for the global optimization upgrade pass.
+"""
+
+from data_models import Board, MaterialDetails, Offcut, Part
+from optimization_global import run_global_optimization_iteration
+
+CORE_DB = {'18MR': {'grade_level': 1}, '18BWR': {'grade_level': 2}}
+
+def test_upgrade_uses_smallest_offcut_and_never_reuses_it():
+    source_material = MaterialDetails('2614 SF_18MR_2614 SF')
+    target_material = MaterialDetails('2614 SF_18BWR_2614 SF')
+
+    source = Board('SRC', source_material, 2440.0, 1220.0, 4.4)
+    parts = [Part(f'P{i}', 600.0, 400.0, 1, source_material, 0, 0) for i in (1, 2)]
+    for part in parts:
+        assert source.place_part(part, source.available_rectangles[0], False,
+                                 source.available_rectangles[0].x, source.available_rectangles[0].y, CORE_DB)
+
+    # A full sheet and a small offcut that only takes one of the parts
+    large = Board('LARGE', target_material, 2440.0, 1220.0, 4.4)
+    small = Board('SMALL', target_material, 2440.0, 1220.0, 4.4)
+    small_offcut = Offcut('SMALL_O1', 0.0, 0.0, 700.0, 500.0, target_material, 'SMALL')
+    small.available_rectangles = [small_offcut]
+
+    boards, _, _, _ = run_global_optimization_iteration(
+        [source, large, small], [], CORE_DB, {}, 4.4, ['18MR', '18BWR'], cost_state={'total_cost': 0.0}
+    )
+
+    # The first part takes the smallest fitting offcut; once used, it is gone for the second part
+    assert small.parts_on_board == [parts[0]]
+    assert small_offcut not in small.available_rectangles
+    assert large.parts_on_board == [parts[1]]
+    assert source not in boards
@@ -0,0 +1,115 @@
+"""
+Tests for the Max Utilisation optimizer.
+"""
+
+import optimization_max_utilisation as max_utilisation
+from data_models import Board, MaterialDetails, Part
+
+CORE_DB = {core: {'Standard Length (mm)': 2440, 'Standard Width (mm)': 1220} for core in ('18MR', '18BWR')}
+
+def _make_parts():
+    parts = []
+    for material_string in ('2614 SF_18MR_2614 SF', '2614 SF_18BWR_2614 SF'):
+        material = MaterialDetails(material_string)
+        for i in range(40):
+            parts.append(Part(f'{material.core_name}_P{i}', 200.0 + 37 * (i % 9), 150.0 + 23 * (i % 7), 1,
+                              material, i % 2, i))
+    return parts
+
+def _layout(boards_by_material):
+    return {signature: [[(part.id, part.x_pos, part.y_pos, part.rotated) for part in board.parts_on_board]
+                        for board in boards]
+            for signature, boards in boards_by_material.items()}
+
+def _optimize(parts, parallel_min_parts, monkeypatch):
+    monkeypatch.setattr(max_utilisation, 'PARALLEL_MIN_PARTS', parallel_min_parts)
+    material_groups = max_utilisation._group_parts_by_material(parts)
+    return max_utilisation._optimize_material_groups(material_groups, CORE_DB, {}, 4.4)
+
+def test_parallel_material_groups_match_serial_on_caller_parts(monkeypatch, caplog):
+    monkeypatch.setattr(max_utilisation.os, 'cpu_count', lambda: 2)
+    serial_parts = _make_parts()
+    serial = _optimize(serial_parts, len(serial_parts) + 1, monkeypatch)
+    parallel_parts = _make_parts()
+    parallel = _optimize(parallel_parts, 0, monkeypatch)
+
+    assert 'Parallel material group optimization failed' not in caplog.text
+    assert _layout(parallel) == _layout(serial)
+
+    # Either way the boards hold, and the placements are recorded on, the caller's own parts
+    for parts, boards_by_material in ((serial_parts, serial), (parallel_parts, parallel)):
+        caller_parts = {id(part) for part in parts}
+        placed = [part for boards in boards_by_material.values() for board in boards for part in board.parts_on_board]
+        assert len(placed) == len(parts)
+        assert all(id(part) in caller_parts for part in placed)
+
+def _board_with_parts(rects):
+    material = MaterialDetails('2614 SF_18MR_2614 SF')
+    board = Board('B1', material, 2440.0, 1220.0, 4.4)
+    for i, (x, y, length, width) in enumerate(rects):
+        part = Part(f'P{i}', length, width, 1, material, 1, i)
+        max_utilisation._record_placement(part, x, y, length, width)
+        board.parts_on_board.append(part)
+    return board
+
+# Three parts of a pinwheel; the fourth closes it, and no straight cut then separates the parts
+PINWHEEL = [(0.0, 0.0, 200.0, 100.0), (200.0, 0.0, 100.0, 200.0), (100.0, 200.0, 200.0, 100.0)]
+PINWHEEL_LAST = (0.0, 100.0, 100.0, 200.0)
+
+def test_guillotine_rejects_start_empty_and_stay_rejected():
+    board = _board_with_parts(PINWHEEL)
+    max_utilisation._get_placed_rects(board)
+    assert board._guillotine_rejects == set()
+
+    assert not max_utilisation._validate_guillotine_constraints(*PINWHEEL_LAST, board)
+    assert PINWHEEL_LAST in board._guillotine_rejects
+    assert not max_utilisation._validate_guillotine_constraints(*PINWHEEL_LAST, board)
+
+def test_replaced_part_list_drops_stale_guillotine_rejects():
+    board = _board_with_parts(PINWHEEL)
+    assert not max_utilisation._validate_guillotine_constraints(*PINWHEEL_LAST, board)
+
+    # Same number of parts, now in a row along the bottom edge, which the last part clears by a straight cut
+    board.parts_on_board = _board_with_parts([(0.0, 0.0, 100.0, 100.0), (200.0, 0.0, 100.0, 100.0),
+                                              (400.0, 0.0, 100.0, 100.0)]).parts_on_board
+    assert max_utilisation._validate_guillotine_constraints(*PINWHEEL_LAST, board)
+    assert board._guillotine_rejects == set()
+
+def _half_board_input():
+    boards = []
+    for material_string, sizes in (('2614 SF_18MR_2614 SF', [(1200.0, 600.0)] * 4 + [(300.0, 200.0)] * 3),
+                                   ('2614 SF_18BWR_2614 SF', [(300.0, 200.0)] * 5)):
+        material = MaterialDetails(material_string)
+        parts = [Part(f'{material.core_name}_P{i}', length, width, 1, material, 1, i)
+                 for i, (length, width) in enumerate(sizes)]
+        boards.extend(max_utilisation._optimize_material_group(parts, CORE_DB, {}, 4.4, material_string))
+    return boards
+
+def test_parallel_half_boards_match_serial(monkeypatch, caplog):
+    monkeypatch.setattr(max_utilisation.os, 'cpu_count', lambda: 2)
+    results = []
+    for parallel_min_boards in (10 ** 9, 1):
+        monkeypatch.setitem(max_utilisation.HALF_BOARD_CONFIG, 'parallel_min_boards', parallel_min_boards)
+        boards = _half_board_input()
+        optimized, savings = max_utilisation.optimize_half_boards(boards, 4.4, CORE_DB, {})
+
+        # Boards left as they were come back as the caller's own boards, rearranged ones as new boards
+        caller_boards = {id(board) for board in boards}
+        results.append(([(board.id, id(board) in caller_boards,
+                          [(part.id, part.x_pos, part.y_pos, part.rotated) for part in board.parts_on_board])
+                         for board in optimized], len(savings)))
+
+    assert 'Parallel half-board optimization failed' not in caplog.text
+    assert results[0] == results[1]
+    assert results[0][1] > 0
+    assert any(kept for _, kept, _ in results[0][0])
+
+def test_half_boards_past_time_limit_keep_every_board(monkeypatch):
+    monkeypatch.setattr(max_utilisation.os, 'cpu_count', lambda: 2)
+    monkeypatch.setitem(max_utilisation.HALF_BOARD_CONFIG, 'max_processing_time', -1)
+    for parallel_min_boards in (10 ** 9, 1):
+        monkeypatch.setitem(max_utilisation.HALF_BOARD_CONFIG, 'parallel_min_boards', parallel_min_boards)
+        boards = _half_board_input()
+        optimized, savings = max_utilisation.optimize_half_boards(boards, 4.4, CORE_DB, {})
+        assert optimized == boards
+        assert savings == []
@@ -0,0 +1,17 @@
+"""
+Tests for the TEST 2 tight nesting optimizer.
+"""
+
+import optimization_test2 as test2
+
+def test_failed_repack_keeps_placement_status():
+    board = test2.Test2Board('B1', 1000.0, 1000.0)
+    placed = test2.Test2Part('P1', 600.0, 600.0)
+    assert board.place_part(placed, 0.0)
+    new_part = test2.Test2Part('P2', 700.0, 600.0)
+
+    # Both parts fit the bare board and their areas together fit too, but they can't share it
+    assert board.repack_with([placed, new_part], 0.0) is None
+    assert placed.placed
+    assert not new_part.placed
+    assert board.parts == [(placed, 0, 0, False)]
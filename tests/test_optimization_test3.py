@@ -0,0 +1,56 @@
+"""
+Tests for the TEST 3 global optimizer.
+"""
+
+import optimization_test3 as test3
+from data_models import MaterialDetails, Part
+
+CORE_DB = {core: {'Standard Length (mm)': 2440, 'Standard Width (mm)': 1220} for core in ('18MR', '18BWR')}
+
+def _make_parts():
+    parts = []
+    for material_string in ('2614 SF_18MR_2614 SF', '2614 SF_18BWR_2614 SF'):
+        material = MaterialDetails(material_string)
+        for i in range(40):
+            parts.append(Part(f'{material.core_name}_P{i}', 200.0 + 37 * (i % 9), 150.0 + 23 * (i % 7), 1,
+                              material, i % 2, i))
+    return parts
+
+def test_parallel_material_groups_match_serial_on_caller_parts(monkeypatch, caplog):
+    monkeypatch.setattr(test3.os, 'cpu_count', lambda: 2)
+    results = []
+    for parallel_min_parts in (10 ** 9, 0):
+        monkeypatch.setattr(test3, 'PARALLEL_MIN_PARTS', parallel_min_parts)
+        parts = _make_parts()
+        boards, unplaced, _, _, _ = test3.GlobalOptimizer(parts, CORE_DB, {}, 4.4).optimize()
+
+        # Either way the boards hold, and the placements are recorded on, the caller's own parts
+        caller_parts = {id(part) for part in parts}
+        placed = [part for board in boards for part in board.parts_on_board]
+        assert len(placed) + len(unplaced) == len(parts)
+        assert all(id(part) in caller_parts for part in placed)
+        results.append([(board.id, [(part.id, part.x_pos, part.y_pos, part.rotated) for part in board.parts_on_board])
+                        for board in boards])
+
+    assert 'Parallel material group optimization failed' not in caplog.text
+    assert results[0] == results[1]
+
+def _overlap(a, b):
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+def test_edge_fit_leaves_disjoint_offcuts_clear_of_the_part():
+    board = test3.Test3Board('B1', 1000.0, 500.0)
+    assert board.place_part(test3.Test3Part('P1', 600.0, 300.0), 0.0)
+
+    # At the right edge the part leaves a 5 mm strip of the offcut beside it, too thin to keep
+    assert board.try_edge_fit(test3.Test3Part('P2', 395.0, 100.0), 0.0)
+    _, x, y, _ = board.parts[-1]
+    placed = (x, y, 395.0, 100.0)
+    assert placed == (605.0, 0, 395.0, 100.0)
+
+    # The free area above the part is kept, split off the offcut the part landed in
+    offcuts = board.offcuts
+    assert (605.0, 100.0, 395.0, 400.0) in offcuts
+    assert not any(_overlap(a, b) for i, a in enumerate(offcuts) for b in offcuts[i + 1:])
+    assert not any(_overlap(offcut, placed) for offcut in offcuts)
+    assert all(length > 10 and width > 10 for _, _, length, width in offcuts)